@@ -4,141 +4,383 @@ Simple web-based image gallery with tag search functionality
 """
 import os
 import json
-from bottle import Bottle, request, response, static_file, template
+import atexit
+import gzip
+import zlib
+import types
+import hashlib
+import importlib.util
+import threading
+import mimetypes
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
+from urllib.parse import quote
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the stdlib encoder
+    orjson = None
+from bottle import Bottle, HTTPError, request, response, static_file, template
 from config import BASE_PATH, WEB_CONFIG, FORMAT_CONFIG
 from core.cache import CacheManager
-from core.metadata import read_tag_metadata, SUPPORTED_EXTENSIONS
+from core.watcher import start_cache_watcher
+from core.thumbnails import get_thumbnail, prune_thumbnails
+from core.metadata import read_tag_metadata, read_tag_metadata_batch, write_tag_metadata, SUPPORTED_EXTENSIONS_TUPLE
+from utils.helpers import parse_query_tags
 
 app = Bottle()
 cache_manager = CacheManager()
-
-# Helper to get supported extensions
-SUPPORTED_EXTENSIONS_SET = set(SUPPORTED_EXTENSIONS)
-
-def get_subdirectories(path):
-    """Get all subdirectories in a path"""
+# Cache saves are deferred to a background thread; write any pending one on shutdown
+atexit.register(cache_manager.save_cache)
+
+# Resolved once; BASE_PATH is fixed for the lifetime of the server
+REAL_BASE = os.path.realpath(BASE_PATH)
+REAL_BASE_NORMCASE = os.path.normcase(REAL_BASE)
+# Paths inside BASE_PATH start with this; join adds the separator unless REAL_BASE is a root
+REAL_BASE_PREFIX = os.path.join(REAL_BASE_NORMCASE, '')
+
+# File system observer started in __main__; while it runs, changed files are
+# dropped from the cache as they change, so refresh needs no mtime scan
+file_watcher = None
+
+# exiftool runs in a subprocess, so reads overlap well beyond the CPU count
+METADATA_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+# Shared by all requests, so worker threads are started once rather than per scan
+metadata_pool = ThreadPoolExecutor(max_workers=METADATA_WORKERS, thread_name_prefix='metadata')
+# Files per exiftool invocation, amortizing process startup over the batch
+METADATA_BATCH_SIZE = 50
+# Seconds to wait for a tag read already running in another request
+INFLIGHT_READ_TIMEOUT = 60
+# Image records serialized per chunk when streaming /api/images
+STREAM_CHUNK_SIZE = 256
+# After a folder is listed, tags of up to this many images in its subfolders are
+# read in the background, so opening a subfolder next finds them cached
+PREFETCH_MAX_FILES = 500
+# One prefetch at a time, so prefetching never takes over the metadata pool
+prefetch_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='prefetch')
+# Folders with a prefetch queued or running
+prefetch_pending = set()
+prefetch_lock = threading.Lock()
+# Browser cache lifetime for /image responses (seconds)
+IMAGE_MAX_AGE = 86400
+# Lifetime for /image URLs carrying the file's mtime as ?v=, which change when the file does
+VERSIONED_IMAGE_MAX_AGE = 365 * 86400
+# Default and largest shorter-side size (pixels) for /thumb
+THUMB_SIZE = 256
+THUMB_MAX_SIZE = 1024
+# Generated thumbnails live next to the metadata cache
+THUMB_DIR = os.path.join(cache_manager.cache_dir, 'thumbnails')
+# Size the thumbnail folder is trimmed back to (oldest first) at startup
+THUMB_DIR_MAX_BYTES = WEB_CONFIG.get('thumbnail_cache_mb', 1024) * 1024 * 1024
+
+# Serialized /api/folders response as (BASE_PATH mtime_ns, body, etag); rebuilt when
+# the root's mtime changes, and cleared by refresh or the watcher for nested changes.
+# Only used while the watcher runs: the root's mtime misses folders added deeper down
+folder_tree_cache = None
+
+def invalidate_folder_tree():
+    """Drop the cached folder tree so the next /api/folders rebuilds it"""
+    global folder_tree_cache
+    folder_tree_cache = None
+
+def to_json_bytes(obj):
+    """Serialize to UTF-8 JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode('utf-8')
+
+# JSON bodies smaller than this are sent uncompressed
+GZIP_MIN_SIZE = 1024
+# Fastest level; tag lists are repetitive enough to compress well regardless
+GZIP_LEVEL = 1
+
+def gzip_json(callback):
+    """Bottle plugin: gzip JSON responses for clients that accept it"""
+    def wrapper(*args, **kwargs):
+        body = callback(*args, **kwargs)
+        if not response.content_type.startswith('application/json'):
+            return body
+        response.set_header('Vary', 'Accept-Encoding')
+        if response.status_code == 304 or 'gzip' not in request.get_header('Accept-Encoding', ''):
+            return body
+        if isinstance(body, bytes):
+            if len(body) < GZIP_MIN_SIZE:
+                return body
+            response.set_header('Content-Encoding', 'gzip')
+            return gzip.compress(body, compresslevel=GZIP_LEVEL)
+        if isinstance(body, types.GeneratorType):
+            response.set_header('Content-Encoding', 'gzip')
+            return gzip_stream(body)
+        return body
+    return wrapper
+
+def gzip_stream(chunks):
+    """Gzip a streamed body chunk by chunk"""
+    # wbits 31 writes a gzip header and trailer around the deflate stream
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
     try:
-        subdirs = []
-        for item in sorted(os.listdir(path)):
-            item_path = os.path.join(path, item)
-            if os.path.isdir(item_path):
-                subdirs.append({
-                    'name': item,
-                    'path': item_path,
-                    'relative': os.path.relpath(item_path, BASE_PATH)
-                })
-        return subdirs
-    except Exception as e:
-        print(f"Error reading directory {path}: {e}")
-        return []
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
+    finally:
+        # Runs the wrapped generator's cleanup even if the client disconnects
+        chunks.close()
+
+app.install(gzip_json)
+
+# Serialized /api/images records, reused until an image's tags or mtime change:
+# {path: (tags, mtime, bytes)}, least recently used first. Bounded, so records of
+# deleted or renamed files age out; refresh also clears it
+IMAGE_RECORD_CACHE_SIZE = 50000
+image_record_cache = OrderedDict()
+image_record_lock = threading.Lock()
+
+def get_image_record(image_path, tags, mtime):
+    """Get the JSON bytes for one /api/images record"""
+    with image_record_lock:
+        cached = image_record_cache.get(image_path)
+        if cached is not None and cached[0] == tags and cached[1] == mtime:
+            image_record_cache.move_to_end(image_path)
+            return cached[2]
+    record = to_json_bytes({
+        'path': image_path,
+        'name': os.path.basename(image_path),
+        'tags': tags,
+        'mtime': mtime
+    })
+    with image_record_lock:
+        image_record_cache[image_path] = (tags, mtime, record)
+        image_record_cache.move_to_end(image_path)
+        if len(image_record_cache) > IMAGE_RECORD_CACHE_SIZE:
+            image_record_cache.popitem(last=False)
+    return record
+
+# Incremented by the file watcher whenever a file or folder is created, deleted or
+# moved; with cache_manager.version it tells whether a listing may have changed
+listing_version = 0
+
+def on_path_change():
+    """File watcher hook for any created, deleted or moved path"""
+    global listing_version
+    listing_version += 1
+
+def is_within_base(real_path):
+    """Check that a resolved path lies inside BASE_PATH"""
+    # The prefix ends in a separator, so /base/foobar does not match /base/foo;
+    # normcase makes the test case-insensitive on Windows, as path lookups are there
+    real_path = os.path.normcase(real_path)
+    return real_path.startswith(REAL_BASE_PREFIX) or real_path == REAL_BASE_NORMCASE
+
+def check_tag_target(image_path):
+    """Check that image_path may have its tags written.
+    Returns None if it can, otherwise an (HTTP status, error message) tuple."""
+    if not image_path:
+        return 400, 'No image path specified'
+
+    if not os.path.exists(image_path):
+        return 404, 'Image not found'
+
+    # Security check: ensure the path is within BASE_PATH
+    if not is_within_base(os.path.realpath(image_path)):
+        return 403, 'Access denied'
+    return None
+
+def follow_folder_link(link_path, current_real, link_chain):
+    """Get the real path to walk into for a symlinked folder, or None if it points back
+    at a folder the walk is already inside (a loop). link_chain holds the real folder
+    the walk was in at each link it followed; with current_real they cover every
+    folder above, since real paths between links only nest deeper."""
+    real = os.path.realpath(link_path)
+    real_prefix = os.path.join(real, '')
+    for walked in link_chain + (current_real,):
+        if walked == real or walked.startswith(real_prefix):
+            return None
+    return real
 
 def get_folder_tree(path, prefix=""):
     """Build a nested folder tree structure"""
     tree = []
-    try:
-        subdirs = get_subdirectories(path)
-        for subdir in subdirs:
+    # relpath is only needed for the root; below it each folder's relative path
+    # is its parent's plus its own name
+    root_relative = os.path.relpath(path, BASE_PATH)
+    root_prefix = '' if root_relative == os.curdir else root_relative + os.sep
+    # Single scandir walk with an explicit stack of (folder, relative prefix, children list
+    # to fill, real path, real folders at followed links)
+    stack = [(path, root_prefix, tree, os.path.realpath(path), ())]
+    while stack:
+        current, relative_prefix, children, current_real, link_chain = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                subdirs = sorted((e for e in it if e.is_dir()), key=lambda e: e.name)
+        except Exception as e:
+            print(f"Error building tree for {current}: {e}")
+            continue
+        for entry in subdirs:
+            relative = relative_prefix + entry.name
             item = {
-                'name': subdir['name'],
-                'path': subdir['path'],
-                'relative': subdir['relative'],
-                'display_name': prefix + subdir['name'],
-                'children': []
+                'name': entry.name,
+                'path': entry.path,
+                'relative': relative
             }
-            # Recursively get subfolders
-            item['children'] = get_folder_tree_nested(subdir['path'])
-            tree.append(item)
-    except Exception as e:
-        print(f"Error building tree for {path}: {e}")
+            if children is tree:
+                item['display_name'] = prefix + entry.name
+            item['children'] = []
+            children.append(item)
+            # Symlinked folders are followed, except into a folder the walk is already inside
+            if not entry.is_symlink():
+                stack.append((entry.path, relative + os.sep, item['children'],
+                              os.path.join(current_real, entry.name), link_chain))
+            else:
+                real = follow_folder_link(entry.path, current_real, link_chain)
+                if real is not None:
+                    stack.append((entry.path, relative + os.sep, item['children'],
+                                  real, link_chain + (current_real,)))
     return tree
 
-def get_folder_tree_nested(path):
-    """Build a hierarchical nested folder tree"""
-    children = []
+def get_images_in_folder(folder_path, recursive=False, with_stat=False):
+    """Yield all supported images in a folder as they are found.
+    With with_stat, yields (path, stat_result) taken from the scandir entry."""
+    # Bound locally; the scan loop below runs once per directory entry
+    extensions = SUPPORTED_EXTENSIONS_TUPLE
+    # Explicit stack of (folder, real path, real folders at followed links) instead of
+    # os.walk; visits folders in the same top-down order
+    stack = [(folder_path, os.path.realpath(folder_path) if recursive else folder_path, ())]
+    while stack:
+        current, current_real, link_chain = stack.pop()
+        # Only matching images and subfolders are kept and sorted; paths share the
+        # folder prefix, so plain string sorts order them by name
+        images = []
+        subdirs = []
+        add_image = images.append
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.is_file():
+                        if entry.name.lower().endswith(extensions):
+                            add_image((entry.path, entry.stat()) if with_stat else entry.path)
+                    elif recursive and entry.is_dir():
+                        # Symlinked folders are followed, except into a folder the walk is already inside
+                        if not entry.is_symlink():
+                            subdirs.append((entry.path, os.path.join(current_real, entry.name), link_chain))
+                        else:
+                            real = follow_folder_link(entry.path, current_real, link_chain)
+                            if real is not None:
+                                subdirs.append((entry.path, real, link_chain + (current_real,)))
+        except OSError as e:
+            # Like os.walk, an unreadable or vanished folder is skipped, not the whole scan
+            print(f"Error reading images from {current}: {e}")
+            continue
+        images.sort()
+        yield from images
+        subdirs.sort(reverse=True)
+        stack.extend(subdirs)
+
+def start_tag_reads(image_paths):
+    """Claim tag reads for the given images and start them in batches on the metadata pool.
+    Returns (reads, waiting) to pass to collect_tag_reads, which must always be called."""
+    owned, waiting = cache_manager.begin_reads(image_paths)
+    reads = []
     try:
-        subdirs = get_subdirectories(path)
-        for subdir in subdirs:
-            item = {
-                'name': subdir['name'],
-                'path': subdir['path'],
-                'relative': subdir['relative'],
-                'children': []
-            }
-            # Recursively get subfolders
-            item['children'] = get_folder_tree_nested(subdir['path'])
-            children.append(item)
-    except Exception as e:
-        print(f"Error building tree for {path}: {e}")
-    return children
-
-def get_images_in_folder(folder_path, recursive=False):
-    """Get all supported images in a folder"""
-    images = []
+        for i in range(0, len(owned), METADATA_BATCH_SIZE):
+            batch = owned[i:i + METADATA_BATCH_SIZE]
+            reads.append((batch, metadata_pool.submit(read_tag_metadata_batch, batch)))
+    except Exception:
+        # e.g. the pool is shut down: release every claim, so other requests
+        # don't wait out INFLIGHT_READ_TIMEOUT on reads that will never be stored
+        for _, future in reads:
+            future.cancel()
+        cache_manager.abort_reads(owned)
+        raise
+    return reads, waiting
+
+def collect_tag_reads(reads, waiting, mtimes=None):
+    """Store the results of start_tag_reads in the cache and return {image_path: tags}.
+    Files already being read by another request are waited on instead of read again.
+    mtimes ({path: mtime} from the folder scan) spares a stat per stored file."""
+    results = {}
     try:
-        if recursive:
-            for root, _, files in os.walk(folder_path):
-                for filename in sorted(files):
-                    if any(filename.lower().endswith(ext) for ext in SUPPORTED_EXTENSIONS_SET):
-                        full_path = os.path.join(root, filename)
-                        images.append(full_path)
-        else:
-            for filename in sorted(os.listdir(folder_path)):
-                full_path = os.path.join(folder_path, filename)
-                if os.path.isfile(full_path) and any(filename.lower().endswith(ext) for ext in SUPPORTED_EXTENSIONS_SET):
-                    images.append(full_path)
+        # Results are consumed here on the calling thread, so the cache is only
+        # ever updated from one thread per request
+        for batch, future in reads:
+            for image_path, tags in future.result().items():
+                cache_manager.finish_read(image_path, tags, mtimes.get(image_path) if mtimes else None)
+                results[image_path] = tags
+    finally:
+        cache_manager.abort_reads([path for batch, _ in reads for path in batch if path not in results])
+
+    for image_path, future in waiting.items():
+        try:
+            results[image_path] = future.result(timeout=INFLIGHT_READ_TIMEOUT)
+        except Exception as e:
+            # The other request's read timed out, failed or was aborted; read the
+            # file here rather than fail this request. Left for the owner (or the
+            # next request) to cache
+            print(f"Waiting for a tag read of {image_path} failed, reading it directly: {e}")
+            results[image_path] = read_tag_metadata(image_path)
+    return results
+
+def read_tags_parallel(image_paths, mtimes=None):
+    """Read tags for the given images in parallel batches and store them in the cache.
+    Returns a dict of {image_path: tags}."""
+    if not image_paths:
+        return {}
+    return collect_tag_reads(*start_tag_reads(image_paths), mtimes)
+
+def prefetch_subfolder_tags(folder_path):
+    """Queue a background read of uncached tags in folder_path's direct subfolders"""
+    with prefetch_lock:
+        if folder_path in prefetch_pending:
+            return
+        prefetch_pending.add(folder_path)
+    prefetch_pool.submit(_prefetch_subfolder_tags, folder_path)
+
+def _prefetch_subfolder_tags(folder_path):
+    try:
+        with os.scandir(folder_path) as it:
+            subdirs = sorted(entry.path for entry in it if entry.is_dir())
+        mtimes = {}
+        for subdir in subdirs:
+            mtimes.update((img, stat.st_mtime) for img, stat in get_images_in_folder(subdir, with_stat=True))
+            if len(mtimes) >= PREFETCH_MAX_FILES:
+                break
+        missing = [img for img, tags in cache_manager.get_many(mtimes).items() if tags is None]
+        if missing:
+            read_tags_parallel(missing[:PREFETCH_MAX_FILES], mtimes)
+            cache_manager.save_cache_later()
     except Exception as e:
-        print(f"Error reading images from {folder_path}: {e}")
-    return images
-
-def get_tags_for_image(image_path):
-    """Get tags for an image, using cache if available and up-to-date"""
-    # Check cache first
-    cached_tags = cache_manager.get_cached_metadata(image_path)
-    if cached_tags is not None:
-        return cached_tags
-
-    # Cache miss or outdated - read from file
-    tags = read_tag_metadata(image_path)
-    cache_manager.update_cache(image_path, tags)
-    return tags
-
-def parse_tags(tag_string):
-    """Parse comma-separated tags into a set"""
-    if not tag_string:
-        return set()
-    return {tag.strip().lower() for tag in tag_string.split(',') if tag.strip()}
+        print(f"Error prefetching tags below {folder_path}: {e}")
+    finally:
+        with prefetch_lock:
+            prefetch_pending.discard(folder_path)
 
 def filter_images_by_tags(images, search_query, search_mode='AND'):
-    """Filter images based on tag search query with AND/OR logic"""
+    """Lazily filter images based on tag search query with AND/OR logic.
+    Tags for the images must already be cached and current (api_images checks them first)."""
     if not search_query or not search_query.strip():
-        return images
+        yield from images
+        return
 
     query = search_query.strip()
-    required_tags = parse_tags(query)
+    required_tags = parse_query_tags(query)
     if not required_tags:
-        return images
+        yield from images
+        return
 
-    is_or_mode = (search_mode == 'OR')
+    # Matching files come from the tag index, so each image costs one set lookup
+    matched = cache_manager.find_files_with_tags(required_tags, match_all=(search_mode != 'OR'))
+    if not matched:
+        return
 
-    filtered = []
     for image_path in images:
-        tags = get_tags_for_image(image_path)
-        image_tags = parse_tags(tags)
-
-        if is_or_mode:
-            # OR: Match if any required tag is present
-            if any(tag in image_tags for tag in required_tags):
-                filtered.append(image_path)
-        else:
-            # AND: Match if all required tags are present
-            if all(tag in image_tags for tag in required_tags):
-                filtered.append(image_path)
-
-    return filtered
+        if image_path in matched:
+            yield image_path
 
-def sort_images(images, sort_option):
-    """Sort images based on sort option"""
-    if not images or not sort_option:
+def sort_images(images, sort_option, mtimes=None, image_tags=None):
+    """Sort images based on sort option (accepts any iterable of paths).
+    mtimes and image_tags map paths to values already collected by the caller."""
+    if not sort_option:
         return images
 
     # Extract sort criteria and direction
@@ -147,28 +389,39 @@ def sort_images(images, sort_option):
         reverse = sort_option.endswith('_desc')
         return sorted(images, key=lambda x: os.path.basename(x).lower(), reverse=reverse)
     elif sort_option.startswith('modified_'):
-        # Sort by modification date
+        # Sort by modification date, using mtimes from the folder scan when given,
+        # otherwise the mtimes already stored (and checked) in the cache
         reverse = sort_option.endswith('_desc')
-        return sorted(images, key=lambda x: os.path.getmtime(x), reverse=reverse)
+        if mtimes is not None:
+            return sorted(images, key=mtimes.__getitem__, reverse=reverse)
+        cache_data = cache_manager.cache_data
+        def mtime_key(path):
+            cached_item = cache_data.get(path)
+            return cached_item['mtime'] if cached_item is not None else os.path.getmtime(path)
+        return sorted(images, key=mtime_key, reverse=reverse)
     elif sort_option.startswith('tags_'):
         # Sort by tags
         reverse = sort_option.endswith('_desc')
-        # Split into tagged and untagged
-        tagged = [(img, get_tags_for_image(img)) for img in images if get_tags_for_image(img)]
-        untagged = [img for img in images if not get_tags_for_image(img)]
+        images = list(images)
+        if image_tags is None:
+            # Uncached tags are read in parallel up front rather than one by one
+            image_tags = {img: cache_manager.get_cached_metadata(img) for img in images}
+            image_tags.update(read_tags_parallel([img for img, tags in image_tags.items() if tags is None]))
+        # Lowercase each image's tags once, then split into tagged and untagged
+        pairs = [(img, (image_tags[img] or '').lower()) for img in images]
+        tagged = [pair for pair in pairs if pair[1]]
+        untagged = [img for img, tags in pairs if not tags]
 
         # Sort tagged items by tag text
-        tagged.sort(key=lambda x: x[1].lower(), reverse=reverse)
+        tagged.sort(key=itemgetter(1), reverse=reverse)
 
         # Return combined list (untagged always at end)
         return [img for img, _ in tagged] + untagged
     else:
         return images
 
-@app.route('/')
-def index():
-    """Main page"""
-    html = '''
+# Main page, built once at import
+INDEX_HTML = '''
 <!DOCTYPE html>
 <html>
 <head>
@@ -644,18 +897,26 @@ def index():
             margin-bottom: 20px;
             box-shadow: 0 1px 3px rgba(0,0,0,0.1);
         }
+        /* Cards are positioned by the virtual scroller; only those near the viewport are mounted */
         .gallery {
-            display: grid;
-            grid-template-columns: repeat(auto-fill, minmax(250px, 1fr));
-            gap: 20px;
+            position: relative;
             margin-top: 20px;
         }
         .image-card {
+            position: absolute;
+            height: 346px;
+            cursor: pointer;
             background: white;
             border-radius: 8px;
             overflow: hidden;
             box-shadow: 0 2px 8px rgba(0,0,0,0.1);
             transition: transform 0.2s, box-shadow 0.2s;
+            /* Cards have a fixed size, so their layout never affects the rest of the
+               grid; overscan rows outside the viewport skip rendering entirely. Long
+               names are cut off with an ellipsis and long tag lists scroll inside the card */
+            contain: layout paint style;
+            content-visibility: auto;
+            contain-intrinsic-size: auto 346px;
         }
         .image-card:hover {
             transform: translateY(-4px);
@@ -680,18 +941,23 @@ def index():
             object-fit: cover;
         }
         .image-info {
+            height: 96px;
             padding: 12px;
         }
         .image-name {
             font-weight: 500;
             margin-bottom: 8px;
-            word-break: break-word;
+            white-space: nowrap;
+            overflow: hidden;
+            text-overflow: ellipsis;
             font-size: 14px;
         }
         .image-tags {
             font-size: 12px;
             color: #7f8c8d;
             line-height: 1.5;
+            max-height: 44px;
+            overflow-y: auto;
         }
         .tag {
             display: inline-block;
@@ -844,13 +1110,135 @@ def index():
         let selectedFolder = '';
         let folderData = [];
         let allImages = [];
+        let imagesByPath = new Map();
         let selectedTags = new Set();
-        let allTags = new Set();
+        // Number of loaded images carrying each tag, kept up to date as tags are saved;
+        // tags added in the editor but not saved yet have a count of 0
+        let tagCounts = new Map();
         let selectedImageCards = new Set();
         let isMultiEditMode = false;
         let multiEditImages = [];
         let isSelectionMode = false;
 
+        // Shared by all untagged images; never modified
+        const EMPTY_TAG_SET = new Set();
+
+        function parseTagSet(tags) {
+            if (!tags) return EMPTY_TAG_SET;
+            const tagSet = new Set(tags.split(',').map(t => t.trim().toLowerCase()).filter(t => t));
+            return tagSet.size > 0 ? tagSet : EMPTY_TAG_SET;
+        }
+
+        // Bit index of every tag seen since the folder was loaded; each image also
+        // keeps its tags as a bitset (Uint32Array words) so filtering is bitwise
+        let tagIds = new Map();
+
+        function tagBitsOf(tagSet) {
+            tagSet.forEach(tag => {
+                if (!tagIds.has(tag)) tagIds.set(tag, tagIds.size);
+            });
+            const bits = new Uint32Array(Math.ceil(tagIds.size / 32));
+            tagSet.forEach(tag => {
+                const id = tagIds.get(tag);
+                bits[id >> 5] |= 1 << (id & 31);
+            });
+            return bits;
+        }
+
+        function tagMasksOf(tags) {
+            // [word index, mask] pairs covering the given tags; null if a tag has no id
+            const masks = new Map();
+            for (const tag of tags) {
+                const id = tagIds.get(tag);
+                if (id === undefined) return null;
+                masks.set(id >> 5, (masks.get(id >> 5) || 0) | (1 << (id & 31)));
+            }
+            return Array.from(masks);
+        }
+
+        function rebuildTagCounts() {
+            tagCounts = new Map();
+            allImages.forEach(img => {
+                img.tagSet.forEach(tag => tagCounts.set(tag, (tagCounts.get(tag) || 0) + 1));
+            });
+        }
+
+        function pruneUnusedTags() {
+            // Drops tags that were added in the editor but never saved
+            tagCounts.forEach((count, tag) => {
+                if (count === 0) tagCounts.delete(tag);
+            });
+        }
+
+        function applySavedTags(path, tags) {
+            // Updates one image and the tag counts in place after a successful save.
+            // Returns true if the tag bar needs rebuilding.
+            const img = imagesByPath.get(path);
+            if (!img) return false;
+
+            const oldSet = img.tagSet;
+            const newSet = parseTagSet(tags);
+            let changed = (oldSet.size === 0) !== (newSet.size === 0);  // untagged count
+            oldSet.forEach(tag => {
+                if (newSet.has(tag)) return;
+                const count = tagCounts.get(tag) - 1;
+                if (count > 0) {
+                    tagCounts.set(tag, count);
+                } else {
+                    tagCounts.delete(tag);
+                    changed = true;
+                }
+            });
+            newSet.forEach(tag => {
+                if (oldSet.has(tag)) return;
+                const count = tagCounts.get(tag) || 0;
+                if (count === 0) changed = true;
+                tagCounts.set(tag, count + 1);
+            });
+
+            img.tags = tags;
+            img.tagSet = newSet;
+            img.tagBits = tagBitsOf(newSet);
+            refreshImageCard(img);
+            return changed;
+        }
+
+        function finishTagEdit(tagsChanged) {
+            // Shows saved edits without refetching the folder
+            pruneUnusedTags();
+            if (tagsChanged) {
+                // Selected tags that no image has anymore could never match
+                selectedTags.forEach(tag => {
+                    if (tag !== '__untagged__' && !tagCounts.has(tag)) selectedTags.delete(tag);
+                });
+                buildTagBar();
+            }
+            if (selectedTags.size > 0) {
+                // The edited images may no longer match the filter
+                filterImages();
+            }
+            // Keeps the cached listing in step, so revisiting shows the saved tags
+            listingCache.set(listingKey, serializeListing(allImages));
+        }
+
+        // Virtual gallery: every card has the same size, so the grid position of any
+        // image follows from its index and only the rows near the viewport are mounted
+        const CARD_HEIGHT = 346;    // matches .image-card height
+        const CARD_MIN_WIDTH = 250;
+        const GRID_GAP = 20;
+        const OVERSCAN_ROWS = 2;    // rows kept mounted above and below the viewport
+        const virtualGallery = {
+            images: [],             // images currently displayed, in order
+            columns: 1,
+            cardWidth: CARD_MIN_WIDTH,
+            measuredWidth: 0,       // gallery width the columns were computed for
+            rowHeight: CARD_HEIGHT + GRID_GAP,
+            renderedRange: [0, 0],  // [start, end) indexes of mounted cards
+            cards: new Map(),       // path -> card element, reused while scrolling
+            framePending: false,
+            needsMeasure: false
+        };
+
         // Load folder tree on page load
         fetch('/api/folders')
             .then(res => res.json())
@@ -969,7 +1357,65 @@ def index():
             filterImages();
         }
 
-        function loadImages() {
+        // Last /api/images listing per folder/recursive/sort, kept in IndexedDB so a
+        // folder shows at once when revisited while a fresh listing is fetched
+        const LISTING_CACHE_LIMIT = 20;
+        const LISTING_KEYS = '__keys__';    // cached keys, least recently stored first
+        const listingCache = {
+            db: null,
+            open() {
+                if (!this.db) {
+                    this.db = new Promise((resolve, reject) => {
+                        if (!window.indexedDB) {
+                            reject(new Error('IndexedDB is not available'));
+                            return;
+                        }
+                        const req = indexedDB.open('gallerytags', 1);
+                        req.onupgradeneeded = () => req.result.createObjectStore('listings');
+                        req.onsuccess = () => resolve(req.result);
+                        req.onerror = () => reject(req.error);
+                    });
+                }
+                return this.db;
+            },
+            async run(mode, action) {
+                const db = await this.open();
+                return new Promise((resolve, reject) => {
+                    const req = action(db.transaction('listings', mode).objectStore('listings'));
+                    req.onsuccess = () => resolve(req.result);
+                    req.onerror = () => reject(req.error);
+                });
+            },
+            get(key) {
+                return this.run('readonly', store => store.get(key)).catch(() => undefined);
+            },
+            async set(key, listing) {
+                if (!window.indexedDB) return;
+                try {
+                    await this.run('readwrite', store => store.put(listing, key));
+                    const keys = ((await this.get(LISTING_KEYS)) || []).filter(k => k !== key);
+                    keys.push(key);
+                    while (keys.length > LISTING_CACHE_LIMIT) {
+                        const oldest = keys.shift();
+                        await this.run('readwrite', store => store.delete(oldest));
+                    }
+                    await this.run('readwrite', store => store.put(keys, LISTING_KEYS));
+                } catch (err) {
+                    console.warn('Could not cache image listing:', err);
+                }
+            }
+        };
+        let listingKey = '';
+        let loadSequence = 0;
+
+        function serializeListing(images) {
+            // Only the fields sent by the server, so listings compare as strings
+            return JSON.stringify(images.map(img => ({
+                path: img.path, name: img.name, tags: img.tags, mtime: img.mtime
+            })));
+        }
+
+        function loadImages(fresh = false) {
             const folder = selectedFolder;
             const recursive = document.getElementById('recursiveToggle').checked;
             const sort = document.getElementById('sortSelect').value;
@@ -984,7 +1430,7 @@ def index():
 
             document.getElementById('stats').style.display = 'block';
             document.getElementById('statusText').textContent = 'Loading...';
-            document.getElementById('gallery').innerHTML = '<div class="loading">Loading images...</div>';
+            showGalleryMessage('Loading images...');
 
             // Load images without search filter to get all images and tags
             const params = new URLSearchParams({
@@ -992,73 +1438,154 @@ def index():
                 recursive: recursive ? '1' : '0',
                 sort: sort
             });
+            const key = params.toString();
+            const sequence = ++loadSequence;
+            listingKey = key;
+            let shownListing = '';
+
+            if (!fresh) {
+                listingCache.get(key).then(listing => {
+                    // Skipped once the fresh listing has been shown
+                    if (listing && sequence === loadSequence && !shownListing) {
+                        shownListing = listing;
+                        showImages(JSON.parse(listing), folder, true);
+                    }
+                });
+            }
 
             fetch('/api/images?' + params)
                 .then(res => res.json())
                 .then(data => {
-                    allImages = data.images;
-
-                    // Extract all unique tags
-                    allTags.clear();
-                    allImages.forEach(img => {
-                        if (img.tags) {
-                            const tags = img.tags.split(',').map(t => t.trim().toLowerCase()).filter(t => t);
-                            tags.forEach(tag => allTags.add(tag));
+                    if (sequence !== loadSequence) return;    // another folder was opened since
+                    const listing = serializeListing(data.images);
+                    listingCache.set(key, listing);
+                    if (listing === shownListing) {
+                        // The cached listing was still current
+                        if (selectedTags.size === 0) {
+                            document.getElementById('statusText').textContent =
+                                `Found ${allImages.length} image(s) in ${folder}`;
                         }
-                    });
-
-                    // Update tag bar
-                    buildTagBar();
-
-                    document.getElementById('statusText').textContent =
-                        `Found ${allImages.length} image(s) in ${folder}`;
-
-                    // Display all images initially
-                    displayImages(allImages);
+                        return;
+                    }
+                    // Replacing the cached listing keeps the scroll position and selection
+                    const view = shownListing ? captureGalleryView() : null;
+                    shownListing = listing;
+                    showImages(data.images, folder, false);
+                    if (view) restoreGalleryView(view);
                 })
                 .catch(err => {
+                    if (sequence !== loadSequence) return;
                     console.error('Error loading images:', err);
-                    document.getElementById('gallery').innerHTML =
-                        '<div class="loading">Error loading images</div>';
+                    if (shownListing) {
+                        showToast('Could not update images, showing cached list', 'error');
+                    } else {
+                        showGalleryMessage('Error loading images');
+                    }
                 });
         }
 
+        function showImages(images, folder, fromCache) {
+            allImages = images;
+
+            // Parse each image's tags once; filtering and editing reuse the set
+            tagIds = new Map();
+            allImages.forEach(img => {
+                img.tagSet = parseTagSet(img.tags);
+                img.tagBits = tagBitsOf(img.tagSet);
+            });
+            imagesByPath = new Map(allImages.map(img => [img.path, img]));
+
+            // Count all unique tags
+            rebuildTagCounts();
+
+            // A fresh listing replacing a cached one keeps the tags selected meanwhile
+            selectedTags.forEach(tag => {
+                if (tag !== '__untagged__' && !tagCounts.has(tag)) selectedTags.delete(tag);
+            });
+
+            // Update tag bar
+            buildTagBar();
+
+            document.getElementById('statusText').textContent =
+                `Found ${allImages.length} image(s) in ${folder}` + (fromCache ? ' (updating...)' : '');
+
+            if (selectedTags.size > 0) {
+                filterImages();
+            } else {
+                // Display all images initially
+                displayImages(allImages);
+            }
+        }
+
+        function captureGalleryView() {
+            return {
+                scrollY: window.scrollY,
+                selected: Array.from(selectedImageCards, card => card.dataset.path)
+            };
+        }
+
+        function restoreGalleryView(view) {
+            // The gallery was rebuilt: apply a pending filter now so the scroll
+            // position is restored against the final layout
+            flushPendingFilter();
+            const vg = virtualGallery;
+            const displayed = new Set(vg.images.map(img => img.path));
+            const selected = view.selected.filter(path => displayed.has(path));
+            // Selected cards outside the viewport are pooled now, so they show as
+            // selected once scrolled to
+            createImageCards(selected.filter(path => !vg.cards.has(path)).map(path => imagesByPath.get(path)));
+            selected.forEach(path => {
+                const card = vg.cards.get(path);
+                card.classList.add('selected');
+                selectedImageCards.add(card);
+            });
+            updateFloatingEditButton();
+            window.scrollTo(0, view.scrollY);
+            renderVisibleCards();
+        }
+
         function buildTagBar() {
             const tagBarTags = document.getElementById('tagBarTags');
             const tagCount = document.getElementById('tagCount');
 
-            tagBarTags.innerHTML = '';
-            tagCount.textContent = allTags.size;
+            tagCount.textContent = tagCounts.size;
 
             // Count untagged images
-            const untaggedCount = allImages.filter(img => !img.tags || img.tags.trim() === '').length;
+            const untaggedCount = allImages.filter(img => img.tagSet.size === 0).length;
 
-            // Add "Untagged" button first if there are untagged images
-            if (untaggedCount > 0) {
-                const untaggedBtn = document.createElement('button');
-                untaggedBtn.className = 'tag-button';
-                untaggedBtn.textContent = `Untagged (${untaggedCount})`;
-                untaggedBtn.onclick = () => toggleTag('__untagged__', untaggedBtn);
-                tagBarTags.appendChild(untaggedBtn);
-            }
-
-            if (allTags.size === 0 && untaggedCount === 0) {
+            if (tagCounts.size === 0 && untaggedCount === 0) {
                 tagBarTags.innerHTML = '<span style="color: #95a5a6; font-style: italic;">No tags found</span>';
                 return;
             }
 
+            // Built as one string and written once; clicks are handled by the
+            // delegated listener on the container, using data-tag
+            const parts = [];
+
+            // Add "Untagged" button first if there are untagged images
+            if (untaggedCount > 0) {
+                const active = selectedTags.has('__untagged__') ? ' active' : '';
+                parts.push(`<button class="tag-button${active}" data-tag="__untagged__">Untagged (${untaggedCount})</button>`);
+            }
+
             // Sort tags alphabetically
-            const sortedTags = Array.from(allTags).sort();
+            const sortedTags = Array.from(tagCounts.keys()).sort();
 
             sortedTags.forEach(tag => {
-                const btn = document.createElement('button');
-                btn.className = 'tag-button';
-                btn.textContent = tag;
-                btn.onclick = () => toggleTag(tag, btn);
-                tagBarTags.appendChild(btn);
+                // Selected tags survive a rebuild after in-place edits
+                const active = selectedTags.has(tag) ? ' active' : '';
+                const escaped = escapeTag(tag);
+                parts.push(`<button class="tag-button${active}" data-tag="${escaped}">${escaped}</button>`);
             });
+
+            tagBarTags.innerHTML = parts.join('');
         }
 
+        document.getElementById('tagBarTags').addEventListener('click', (e) => {
+            const btn = e.target.closest('.tag-button');
+            if (btn) toggleTag(btn.dataset.tag, btn);
+        });
+
         function toggleTag(tag, button) {
             if (selectedTags.has(tag)) {
                 selectedTags.delete(tag);
@@ -1070,7 +1597,22 @@ def index():
             filterImages();
         }
 
+        let filterPending = false;
+
         function filterImages() {
+            // Tags clicked in quick succession are filtered once, on the next frame
+            if (filterPending) return;
+            filterPending = true;
+            requestAnimationFrame(flushPendingFilter);
+        }
+
+        function flushPendingFilter() {
+            if (!filterPending) return;
+            filterPending = false;
+            filterImagesNow();
+        }
+
+        function filterImagesNow() {
             if (selectedTags.size === 0) {
                 // Show all images
                 displayImages(allImages);
@@ -1080,9 +1622,14 @@ def index():
             const searchMode = document.getElementById('searchMode').value;
             const hasUntagged = selectedTags.has('__untagged__');
             const regularTags = Array.from(selectedTags).filter(tag => tag !== '__untagged__');
+            const isOrMode = searchMode === 'OR';
+            // Selected tags as bit masks, so each image is tested with a few word ANDs.
+            // A tag without an id is on no image: AND matches nothing, OR ignores it
+            const masks = tagMasksOf(regularTags) || (isOrMode ? tagMasksOf(regularTags.filter(tag => tagIds.has(tag))) : null);
 
             const filtered = allImages.filter(img => {
-                const isUntagged = !img.tags || img.tags.trim() === '';
+                const imageTags = img.tagSet;
+                const isUntagged = imageTags.size === 0;
 
                 // If image is untagged
                 if (isUntagged) {
@@ -1095,23 +1642,32 @@ def index():
                 }
 
                 // Image has tags, check against regular tag filters
-                const imageTags = new Set(
-                    img.tags.split(',').map(t => t.trim().toLowerCase()).filter(t => t)
-                );
-
                 let matchesRegularTags = false;
-                if (regularTags.length > 0) {
-                    if (searchMode === 'OR') {
+                if (regularTags.length > 0 && masks !== null) {
+                    const bits = img.tagBits;
+                    if (isOrMode) {
                         // OR: Match if any selected tag is present
-                        matchesRegularTags = regularTags.some(tag => imageTags.has(tag));
+                        matchesRegularTags = false;
+                        for (const [word, mask] of masks) {
+                            if (bits[word] & mask) {
+                                matchesRegularTags = true;
+                                break;
+                            }
+                        }
                     } else {
                         // AND: Match if all selected tags are present
-                        matchesRegularTags = regularTags.every(tag => imageTags.has(tag));
+                        matchesRegularTags = true;
+                        for (const [word, mask] of masks) {
+                            if ((bits[word] & mask) !== mask) {
+                                matchesRegularTags = false;
+                                break;
+                            }
+                        }
                     }
                 }
 
                 // If "untagged" is selected with other tags in OR mode, include if matches any tag
-                if (hasUntagged && searchMode === 'OR') {
+                if (hasUntagged && isOrMode) {
                     return matchesRegularTags;
                 }
 
@@ -1125,19 +1681,14 @@ def index():
 
         function applySorting() {
             const sortOption = document.getElementById('sortSelect').value;
+            // Sorts the filtered images, so a filter still waiting for its frame runs first
+            flushPendingFilter();
 
-            // Get currently displayed images (respecting filters)
-            const gallery = document.getElementById('gallery');
-            const cards = Array.from(gallery.querySelectorAll('.image-card'));
-
-            if (cards.length === 0) return;
+            // Get currently displayed images (respecting filters); most of their
+            // cards are not mounted, so read them from the virtual gallery
+            if (virtualGallery.images.length === 0) return;
 
-            // Extract image data from cards
-            let imagesToSort = cards.map(card => ({
-                path: card.dataset.path,
-                name: card.dataset.name,
-                tags: card.dataset.tags || ''
-            }));
+            let imagesToSort = virtualGallery.images.slice();
 
             // Sort the images
             if (sortOption.startsWith('name_')) {
@@ -1176,33 +1727,189 @@ def index():
             displayImages(imagesToSort);
         }
 
-        function displayImages(images) {
+        function showGalleryMessage(message) {
             const gallery = document.getElementById('gallery');
+            virtualGallery.images = [];
+            virtualGallery.cards.clear();
+            virtualGallery.renderedRange = [0, 0];
+            gallery.style.height = '';
+            gallery.innerHTML = `<div class="loading">${escapeHtml(message)}</div>`;
+        }
 
+        function displayImages(images) {
             if (images.length === 0) {
-                gallery.innerHTML = '<div class="loading">No images found</div>';
+                showGalleryMessage('No images found');
                 return;
             }
 
+            const gallery = document.getElementById('gallery');
             gallery.innerHTML = '';
             selectedImageCards.clear();
 
-            images.forEach(img => {
-                const card = document.createElement('div');
-                card.className = 'image-card';
-                card.style.cursor = 'pointer';
+            virtualGallery.images = images;
+            virtualGallery.cards.clear();
+            virtualGallery.renderedRange = [0, 0];
+            measureGallery();
+            renderVisibleCards();
+        }
+
+        function measureGallery() {
+            // Single layout read; columns follow the old auto-fill minmax(250px, 1fr) grid
+            const gallery = document.getElementById('gallery');
+            let width = gallery.clientWidth;
+            // Setting the height can add or remove the page scrollbar, which changes the
+            // width without a resize event; measure again until the width holds
+            for (let attempt = 0; attempt < 3; attempt++) {
+                const columns = Math.max(1, Math.floor((width + GRID_GAP) / (CARD_MIN_WIDTH + GRID_GAP)));
+                virtualGallery.columns = columns;
+                virtualGallery.cardWidth = (width - GRID_GAP * (columns - 1)) / columns;
+
+                const rows = Math.ceil(virtualGallery.images.length / columns);
+                gallery.style.height = Math.max(0, rows * virtualGallery.rowHeight - GRID_GAP) + 'px';
+
+                const newWidth = gallery.clientWidth;
+                if (newWidth === width) break;
+                width = newWidth;
+            }
+            virtualGallery.measuredWidth = width;
+        }
+
+        function renderVisibleCards() {
+            const vg = virtualGallery;
+            const total = vg.images.length;
+            if (total === 0) return;
+
+            const gallery = document.getElementById('gallery');
+            const top = gallery.getBoundingClientRect().top;
+            const rows = Math.ceil(total / vg.columns);
+            const firstRow = Math.max(0, Math.floor(-top / vg.rowHeight) - OVERSCAN_ROWS);
+            const lastRow = Math.min(rows - 1, Math.floor((window.innerHeight - top) / vg.rowHeight) + OVERSCAN_ROWS);
+            const start = Math.min(total, firstRow * vg.columns);
+            const end = Math.min(total, (lastRow + 1) * vg.columns);
+
+            const [oldStart, oldEnd] = vg.renderedRange;
+            if (start === oldStart && end === oldEnd) return;
+
+            // Detach cards that left the window; they stay pooled for when they scroll back
+            for (let i = oldStart; i < oldEnd; i++) {
+                if (i < start || i >= end) {
+                    const card = vg.cards.get(vg.images[i].path);
+                    if (card) card.remove();
+                }
+            }
+
+            // Cards not in the pool yet are built from one HTML string in a single parse
+            const missing = [];
+            for (let i = start; i < end; i++) {
+                if ((i < oldStart || i >= oldEnd) && !vg.cards.has(vg.images[i].path)) {
+                    missing.push(vg.images[i]);
+                }
+            }
+            if (missing.length > 0) createImageCards(missing);
+
+            // Mount cards that entered the window in one insertion
+            const fragment = document.createDocumentFragment();
+            for (let i = start; i < end; i++) {
+                if (i >= oldStart && i < oldEnd) continue;
+                const card = vg.cards.get(vg.images[i].path);
+                const row = Math.floor(i / vg.columns);
+                const column = i % vg.columns;
+                card.style.width = vg.cardWidth + 'px';
+                card.style.left = column * (vg.cardWidth + GRID_GAP) + 'px';
+                card.style.top = row * vg.rowHeight + 'px';
+                fragment.appendChild(card);
+            }
+            gallery.appendChild(fragment);
+            vg.renderedRange = [start, end];
+        }
+
+        function scheduleGalleryRender(remeasure) {
+            // Coalesces scroll and resize events into one render per frame
+            if (remeasure) virtualGallery.needsMeasure = true;
+            if (virtualGallery.framePending) return;
+            virtualGallery.framePending = true;
+            requestAnimationFrame(() => {
+                const vg = virtualGallery;
+                vg.framePending = false;
+                if (vg.needsMeasure && vg.images.length > 0) {
+                    // Column count may have changed: re-place every mounted card
+                    vg.cards.forEach(card => card.remove());
+                    vg.renderedRange = [0, 0];
+                    measureGallery();
+                }
+                vg.needsMeasure = false;
+                renderVisibleCards();
+            });
+        }
+
+        window.addEventListener('scroll', () => scheduleGalleryRender(false), { passive: true });
+        if (window.ResizeObserver) {
+            // Also catches width changes without a window resize, e.g. the scrollbar
+            // appearing as the page grows; height changes we make ourselves are ignored
+            new ResizeObserver(() => {
+                const gallery = document.getElementById('gallery');
+                if (gallery.clientWidth !== virtualGallery.measuredWidth) scheduleGalleryRender(true);
+            }).observe(document.getElementById('gallery'));
+        } else {
+            window.addEventListener('resize', () => scheduleGalleryRender(true));
+        }
+
+        function createImageCards(images) {
+            // Parse all new cards at once, then add them to the pool
+            const template = document.createElement('template');
+            template.innerHTML = images.map(imageCardHtml).join('');
+            Array.from(template.content.children).forEach((card, i) => {
+                const img = images[i];
+                // Set as properties, so paths never need attribute escaping
                 card.dataset.path = img.path;
                 card.dataset.name = img.name;
                 card.dataset.tags = img.tags || '';
+                virtualGallery.cards.set(img.path, card);
+            });
+        }
+
+        function imageUrl(path) {
+            // The mtime version lets the browser cache each revision of the file; it is
+            // sent in full, since a same-size rewrite can land within the same second
+            const img = imagesByPath.get(path);
+            const version = img && img.mtime ? '&v=' + img.mtime : '';
+            return '/image?path=' + encodeURIComponent(path) + version;
+        }
 
-                const tags = img.tags ? img.tags.split(',').map(t => t.trim()).filter(t => t) : [];
-                const tagsHtml = tags.length > 0
-                    ? tags.map(tag => `<span class="tag">${escapeHtml(tag)}</span>`).join('')
-                    : '<span class="no-tags">No tags</span>';
+        // Thumbnail size requested for grid cards (shorter side, device pixels)
+        const THUMB_SIZE = (window.devicePixelRatio || 1) > 1 ? 512 : 256;
 
-                card.innerHTML = `
+        function thumbnailUrl(path) {
+            // Grid cards use downscaled copies; the modal keeps the full image
+            return imageUrl(path).replace('/image?', '/thumb?') + '&w=' + THUMB_SIZE;
+        }
+
+        function refreshImageCard(img) {
+            // Rebuilds a pooled card after its tags changed, keeping its place and selection
+            const oldCard = virtualGallery.cards.get(img.path);
+            if (!oldCard) return;
+            virtualGallery.cards.delete(img.path);
+            if (!oldCard.parentNode) return;
+
+            createImageCards([img]);
+            const card = virtualGallery.cards.get(img.path);
+            card.style.cssText = oldCard.style.cssText;
+            if (selectedImageCards.delete(oldCard)) {
+                selectedImageCards.add(card);
+                card.classList.add('selected');
+            }
+            oldCard.replaceWith(card);
+        }
+
+        function imageCardHtml(img) {
+            const tags = img.tags ? img.tags.split(',').map(t => t.trim()).filter(t => t) : [];
+            const tagsHtml = tags.length > 0
+                ? tags.map(tag => `<span class="tag">${escapeTag(tag)}</span>`).join('')
+                : '<span class="no-tags">No tags</span>';
+
+            return `<div class="image-card">
                     <div class="image-wrapper">
-                        <img src="/image?path=${encodeURIComponent(img.path)}"
+                        <img src="${thumbnailUrl(img.path)}"
                              alt="${escapeHtml(img.name)}"
                              loading="lazy">
                     </div>
@@ -1210,22 +1917,22 @@ def index():
                         <div class="image-name">${escapeHtml(img.name)}</div>
                         <div class="image-tags">${tagsHtml}</div>
                     </div>
-                `;
-
-                // Left-click handler
-                card.addEventListener('click', (e) => {
-                    handleImageLeftClick(card);
-                });
+                </div>`;
+        }
 
-                // Right-click handler
-                card.addEventListener('contextmenu', (e) => {
-                    e.preventDefault();
-                    handleImageRightClick(card);
-                });
+        // One delegated listener per event for all cards, mounted or not
+        document.getElementById('gallery').addEventListener('click', (e) => {
+            const card = e.target.closest('.image-card');
+            if (card) handleImageLeftClick(card);
+        });
 
-                gallery.appendChild(card);
-            });
-        }
+        document.getElementById('gallery').addEventListener('contextmenu', (e) => {
+            const card = e.target.closest('.image-card');
+            if (card) {
+                e.preventDefault();
+                handleImageRightClick(card);
+            }
+        });
 
         function handleImageLeftClick(card) {
             if (isSelectionMode) {
@@ -1313,8 +2020,8 @@ def index():
                     const toastMessage = `Refreshed updated files (${data.refreshed}/${total})`;
                     document.getElementById('statusText').textContent = data.message;
                     showToast(toastMessage, 'success');
-                    // Reload images to show updated tags
-                    loadImages();
+                    // Reload images to show updated tags, bypassing the cached listing
+                    loadImages(true);
                 })
                 .catch(err => {
                     console.error('Error refreshing:', err);
@@ -1322,10 +2029,23 @@ def index():
                 });
         }
 
+        // Quotes too, so the result is also safe inside attribute values
+        const HTML_ESCAPES = {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'};
+
         function escapeHtml(text) {
-            const div = document.createElement('div');
-            div.textContent = text;
-            return div.innerHTML;
+            return String(text).replace(/[&<>"']/g, ch => HTML_ESCAPES[ch]);
+        }
+
+        // Tags repeat across cards, the tag bar and the modal, so each is escaped once
+        const escapedTags = new Map();
+
+        function escapeTag(tag) {
+            let escaped = escapedTags.get(tag);
+            if (escaped === undefined) {
+                escaped = escapeHtml(tag);
+                escapedTags.set(tag, escaped);
+            }
+            return escaped;
         }
 
         // Image Modal Functions
@@ -1340,18 +2060,14 @@ def index():
             currentImagePath = path;
             originalTagsString = tags || '';
 
-            // Parse current tags
-            currentImageTags.clear();
-            originalImageTags.clear();
-            if (tags) {
-                tags.split(',').map(t => t.trim().toLowerCase()).filter(t => t).forEach(tag => {
-                    currentImageTags.add(tag);
-                    originalImageTags.add(tag);
-                });
-            }
+            // Copy the tags parsed at load time
+            const img = imagesByPath.get(path);
+            const tagSet = img ? img.tagSet : parseTagSet(tags);
+            currentImageTags = new Set(tagSet);
+            originalImageTags = new Set(tagSet);
 
             // Set image source
-            document.getElementById('modalImage').src = '/image?path=' + encodeURIComponent(path);
+            document.getElementById('modalImage').src = imageUrl(path);
             document.getElementById('modalImage').alt = name;
 
             // Render tags
@@ -1368,17 +2084,21 @@ def index():
             }
 
             isMultiEditMode = true;
-            multiEditImages = Array.from(selectedImageCards).map(card => ({
-                path: card.dataset.path,
-                name: card.dataset.name,
-                tags: card.dataset.tags || '',
-                originalTags: new Set((card.dataset.tags || '').split(',').map(t => t.trim().toLowerCase()).filter(t => t)),
-                currentTags: new Set((card.dataset.tags || '').split(',').map(t => t.trim().toLowerCase()).filter(t => t))
-            }));
+            multiEditImages = Array.from(selectedImageCards).map(card => {
+                const img = imagesByPath.get(card.dataset.path);
+                const tagSet = img ? img.tagSet : parseTagSet(card.dataset.tags);
+                return {
+                    path: card.dataset.path,
+                    name: card.dataset.name,
+                    tags: card.dataset.tags || '',
+                    originalTags: new Set(tagSet),
+                    currentTags: new Set(tagSet)
+                };
+            });
 
             // Calculate tag states (all/some/none)
             tagStates.clear();
-            allTags.forEach(tag => {
+            tagCounts.forEach((_, tag) => {
                 let count = 0;
                 multiEditImages.forEach(img => {
                     if (img.currentTags.has(tag)) count++;
@@ -1394,7 +2114,7 @@ def index():
             });
 
             // Set modal image to first selected
-            document.getElementById('modalImage').src = '/image?path=' + encodeURIComponent(multiEditImages[0].path);
+            document.getElementById('modalImage').src = imageUrl(multiEditImages[0].path);
             document.getElementById('modalImage').alt = `Multi-edit (${multiEditImages.length} images)`;
 
             // Render tags
@@ -1404,65 +2124,134 @@ def index():
             document.getElementById('imageModal').classList.add('active');
         }
 
+        // Class names for the modal tag button states
+        const MODAL_TAG_CLASSES = {
+            all: 'modal-tag-button active',
+            some: 'modal-tag-button partial',
+            none: 'modal-tag-button'
+        };
+        let modalRenderPending = false;
+        // Button class changes from toggles, applied together on the next frame
+        const pendingModalTagClasses = new Map();
+
         function renderModalTags() {
+            // Rebuilt at most once per frame, however often it is requested
+            if (modalRenderPending) return;
+            modalRenderPending = true;
+            requestAnimationFrame(() => {
+                modalRenderPending = false;
+                renderModalTagsNow();
+            });
+        }
+
+        function getModalTagState(tag) {
+            if (isMultiEditMode) {
+                // Multi-edit mode: all/some/none states
+                return tagStates.get(tag) || 'none';
+            }
+            // Single edit mode: active/inactive
+            return currentImageTags.has(tag) ? 'all' : 'none';
+        }
+
+        // Modal tag buttons by tag, kept across renders and openings; only their
+        // classes and order are updated, clicks go through the delegated listeners below
+        const modalTagButtons = new Map();
+        let modalAddTagButton = null;
+
+        function modalTagButton(tag) {
+            let button = modalTagButtons.get(tag);
+            if (!button) {
+                button = document.createElement('button');
+                button.dataset.tag = tag;
+                button.textContent = tag;
+                modalTagButtons.set(tag, button);
+            }
+            return button;
+        }
+
+        function renderModalTagsNow() {
             const container = document.getElementById('modalTagsContainer');
-            container.innerHTML = '';
-            container.classList.remove('empty');
 
+            // Read pass: every tag's state, from plain data only.
             // Sort all tags alphabetically
-            const sortedTags = Array.from(allTags).sort();
+            const states = Array.from(tagCounts.keys()).sort().map(tag => ({ tag, state: getModalTagState(tag) }));
 
-            sortedTags.forEach(tag => {
-                const btn = document.createElement('button');
-                btn.className = 'modal-tag-button';
-                btn.dataset.tag = tag;
+            // Buttons of tags that no longer exist are dropped
+            modalTagButtons.forEach((button, tag) => {
+                if (!tagCounts.has(tag)) modalTagButtons.delete(tag);
+            });
 
-                if (isMultiEditMode) {
-                    // Multi-edit mode: show all/some/none states
-                    const state = tagStates.get(tag) || 'none';
-                    if (state === 'all') {
-                        btn.classList.add('active');
-                    } else if (state === 'some') {
-                        btn.classList.add('partial');
-                    }
-                } else {
-                    // Single edit mode: show active/inactive
-                    const isActive = currentImageTags.has(tag);
-                    if (isActive) {
-                        btn.classList.add('active');
-                    }
-                }
+            if (!modalAddTagButton) {
+                modalAddTagButton = document.createElement('button');
+                modalAddTagButton.className = 'modal-tag-button add-new';
+                modalAddTagButton.textContent = '+ Add New';
+            }
 
-                btn.textContent = tag;
+            // Write pass: buttons already in place are left alone, others are moved in
+            // front of the current position; whatever remains after the last is removed
+            const buttons = states.map(({ tag, state }) => {
+                const button = modalTagButton(tag);
+                if (button.className !== MODAL_TAG_CLASSES[state]) {
+                    button.className = MODAL_TAG_CLASSES[state];
+                }
+                return button;
+            });
+            // Add "+ Add New" button at the end
+            buttons.push(modalAddTagButton);
 
-                // Left-click to toggle
-                btn.onclick = (e) => {
-                    e.preventDefault();
-                    toggleModalTag(tag, btn);
-                };
+            let next = container.firstChild;
+            buttons.forEach(button => {
+                if (button === next) {
+                    next = next.nextSibling;
+                } else {
+                    container.insertBefore(button, next);
+                }
+            });
+            while (next) {
+                const stale = next;
+                next = next.nextSibling;
+                stale.remove();
+            }
+            container.classList.remove('empty');
+            pendingModalTagClasses.clear();
+        }
 
-                // Right-click to reset
-                btn.oncontextmenu = (e) => {
-                    e.preventDefault();
-                    resetModalTag(tag, btn);
-                };
+        function setModalTagState(button, state) {
+            // Queued so a burst of toggles costs one style recalculation
+            if (pendingModalTagClasses.size === 0) {
+                requestAnimationFrame(flushModalTagClasses);
+            }
+            pendingModalTagClasses.set(button, MODAL_TAG_CLASSES[state]);
+        }
 
-                container.appendChild(btn);
+        function flushModalTagClasses() {
+            pendingModalTagClasses.forEach((className, button) => {
+                button.className = className;
             });
+            pendingModalTagClasses.clear();
+        }
 
-            // Add "+ Add New" button at the end
-            const addBtn = document.createElement('button');
-            addBtn.className = 'modal-tag-button add-new';
-            addBtn.textContent = '+ Add New';
-            addBtn.onclick = (e) => {
-                e.preventDefault();
+        // Left-click toggles a tag, right-click resets it; "+ Add New" prompts for a tag
+        document.getElementById('modalTagsContainer').addEventListener('click', (e) => {
+            const btn = e.target.closest('.modal-tag-button');
+            if (!btn) return;
+            e.preventDefault();
+            if (btn.classList.contains('add-new')) {
                 const newTag = prompt('Enter new tag name:');
                 if (newTag) {
                     addModalTag(newTag);
                 }
-            };
-            container.appendChild(addBtn);
-        }
+            } else {
+                toggleModalTag(btn.dataset.tag, btn);
+            }
+        });
+
+        document.getElementById('modalTagsContainer').addEventListener('contextmenu', (e) => {
+            const btn = e.target.closest('.modal-tag-button');
+            if (!btn || btn.classList.contains('add-new')) return;
+            e.preventDefault();
+            resetModalTag(btn.dataset.tag, btn);
+        });
 
         function toggleModalTag(tag, button) {
             if (isMultiEditMode) {
@@ -1473,29 +2262,20 @@ def index():
                     // Remove from all images
                     multiEditImages.forEach(img => img.currentTags.delete(tag));
                     tagStates.set(tag, 'none');
-                    button.classList.remove('active');
-                } else if (currentState === 'some') {
-                    // Add to all images
-                    multiEditImages.forEach(img => img.currentTags.add(tag));
-                    tagStates.set(tag, 'all');
-                    button.classList.remove('partial');
-                    button.classList.add('active');
                 } else {
                     // Add to all images
                     multiEditImages.forEach(img => img.currentTags.add(tag));
                     tagStates.set(tag, 'all');
-                    button.classList.add('active');
                 }
             } else {
                 // Single edit mode
                 if (currentImageTags.has(tag)) {
                     currentImageTags.delete(tag);
-                    button.classList.remove('active');
                 } else {
                     currentImageTags.add(tag);
-                    button.classList.add('active');
                 }
             }
+            setModalTagState(button, getModalTagState(tag));
         }
 
         function resetModalTag(tag, button) {
@@ -1515,14 +2295,10 @@ def index():
                     if (img.currentTags.has(tag)) count++;
                 });
 
-                button.classList.remove('active', 'partial');
-
                 if (count === multiEditImages.length) {
                     tagStates.set(tag, 'all');
-                    button.classList.add('active');
                 } else if (count > 0) {
                     tagStates.set(tag, 'some');
-                    button.classList.add('partial');
                 } else {
                     tagStates.set(tag, 'none');
                 }
@@ -1530,12 +2306,11 @@ def index():
                 // Single edit mode: reset to original
                 if (originalImageTags.has(tag)) {
                     currentImageTags.add(tag);
-                    button.classList.add('active');
                 } else {
                     currentImageTags.delete(tag);
-                    button.classList.remove('active');
                 }
             }
+            setModalTagState(button, getModalTagState(tag));
         }
 
         function addModalTag(tag) {
@@ -1550,8 +2325,8 @@ def index():
                     currentImageTags.add(tag);
                 }
 
-                // Add to all tags if new
-                allTags.add(tag);
+                // Add to all tags if new (unsaved, so count 0)
+                if (!tagCounts.has(tag)) tagCounts.set(tag, 0);
 
                 // Re-render to show the new tag
                 renderModalTags();
@@ -1564,16 +2339,9 @@ def index():
             currentImageTags.clear();
             originalTagsString = '';
 
-            // Recalculate allTags from actual images to remove any unused tags
-            // (e.g., tags that were created but not saved)
+            // Remove any unused tags (e.g., tags that were created but not saved)
             if (!saved) {
-                allTags.clear();
-                allImages.forEach(img => {
-                    if (img.tags) {
-                        const tags = img.tags.split(',').map(t => t.trim().toLowerCase()).filter(t => t);
-                        tags.forEach(tag => allTags.add(tag));
-                    }
-                });
+                pruneUnusedTags();
                 buildTagBar();
             }
 
@@ -1593,52 +2361,83 @@ def index():
             }
         }
 
+        async function saveTagUpdates(updates) {
+            // Saves [{path, tags}] in one request; resolves to [{path, success, error}]
+            if (updates.length === 0) return [];
+
+            const response = await fetch('/api/tags/batch', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify({ updates })
+            });
+
+            if (response.status !== 404) {
+                const data = await response.json();
+                if (!response.ok) throw new Error(data.error || 'Unknown error');
+                return data.results;
+            }
+
+            // Batch endpoint unavailable: send the single updates in parallel instead
+            return Promise.all(updates.map(async update => {
+                try {
+                    const single = await fetch('/api/tags', {
+                        method: 'POST',
+                        headers: {
+                            'Content-Type': 'application/json'
+                        },
+                        body: JSON.stringify(update)
+                    });
+                    const data = await single.json();
+                    return { path: update.path, success: single.ok && data.success, error: data.error };
+                } catch (err) {
+                    return { path: update.path, success: false, error: err.message };
+                }
+            }));
+        }
+
         async function saveImageTags() {
             if (isMultiEditMode) {
                 // Multi-edit mode: save all images
                 let allSuccess = true;
                 let savedCount = 0;
+                let tagsChanged = false;
 
+                // Only images whose tags changed are sent
+                const updates = [];
                 for (const img of multiEditImages) {
                     const newTags = Array.from(img.currentTags).join(', ');
                     const originalTags = Array.from(img.originalTags).join(', ');
-
-                    // Skip if no changes
-                    if (newTags === originalTags) {
-                        continue;
+                    if (newTags !== originalTags) {
+                        updates.push({ path: img.path, tags: newTags });
                     }
+                }
 
-                    try {
-                        const response = await fetch('/api/tags', {
-                            method: 'POST',
-                            headers: {
-                                'Content-Type': 'application/json'
-                            },
-                            body: JSON.stringify({
-                                path: img.path,
-                                tags: newTags
-                            })
-                        });
-
-                        const data = await response.json();
-
-                        if (response.ok && data.success) {
-                            savedCount++;
-                        } else {
-                            allSuccess = false;
-                            console.error('Error saving tags for', img.path, data.error);
-                        }
-                    } catch (err) {
+                let results;
+                try {
+                    results = await saveTagUpdates(updates);
+                } catch (err) {
+                    console.error('Error saving tags:', err);
+                    results = updates.map(update => ({ path: update.path, success: false, error: err.message }));
+                }
+
+                const tagsByPath = new Map(updates.map(update => [update.path, update.tags]));
+                results.forEach(result => {
+                    if (result.success) {
+                        savedCount++;
+                        if (applySavedTags(result.path, tagsByPath.get(result.path))) tagsChanged = true;
+                    } else {
                         allSuccess = false;
-                        console.error('Error saving tags for', img.path, err);
+                        console.error('Error saving tags for', result.path, result.error);
                     }
-                }
+                });
 
                 closeImageModal(savedCount > 0);
 
                 if (savedCount > 0) {
-                    // Reload images to show updated tags
-                    loadImages();
+                    // Saved images were updated in place, no reload needed
+                    finishTagEdit(tagsChanged);
                 }
 
                 if (!allSuccess) {
@@ -1669,9 +2468,10 @@ def index():
                     const data = await response.json();
 
                     if (response.ok && data.success) {
+                        const tagsChanged = applySavedTags(currentImagePath, newTags);
                         closeImageModal(true);
-                        // Reload images to show updated tags
-                        loadImages();
+                        // Updated in place, no reload needed
+                        finishTagEdit(tagsChanged);
                     } else {
                         alert('Error saving tags: ' + (data.error || 'Unknown error'));
                     }
@@ -1682,18 +2482,21 @@ def index():
             }
         }
 
+        let toastHideTimer = null;
+
         function showToast(message, type = 'info') {
             const toast = document.getElementById('toast');
             toast.textContent = message;
             toast.className = 'toast ' + type;
 
-            // Show toast
-            setTimeout(() => {
+            // Show toast once the hidden state has been painted, so it transitions in
+            requestAnimationFrame(() => requestAnimationFrame(() => {
                 toast.classList.add('show');
-            }, 10);
+            }));
 
-            // Hide toast after 2 seconds
-            setTimeout(() => {
+            // Hide toast after 2 seconds; a newer toast restarts the timer
+            clearTimeout(toastHideTimer);
+            toastHideTimer = setTimeout(() => {
                 toast.classList.remove('show');
             }, 2000);
         }
@@ -1721,18 +2524,55 @@ def index():
 </body>
 </html>
     '''
-    return html
+# Pre-compressed copy and validator for the main page, so / does no per-request work
+# Encoded once at import so requests write the bytes without re-encoding the page
+INDEX_HTML_BYTES = INDEX_HTML.encode('utf-8')
+INDEX_HTML_GZIP = gzip.compress(INDEX_HTML_BYTES, compresslevel=9)
+INDEX_ETAG = '"' + hashlib.sha1(INDEX_HTML_BYTES).hexdigest() + '"'
+
+@app.route('/')
+def index():
+    """Main page"""
+    # no-cache still lets the browser keep the page, but revalidates it (usually a 304)
+    response.set_header('ETag', INDEX_ETAG)
+    response.set_header('Cache-Control', 'no-cache')
+    response.set_header('Vary', 'Accept-Encoding')
+    if request.get_header('If-None-Match') == INDEX_ETAG:
+        response.status = 304
+        return ''
+
+    response.content_type = 'text/html; charset=UTF-8'
+    if 'gzip' in request.get_header('Accept-Encoding', ''):
+        response.set_header('Content-Encoding', 'gzip')
+        return INDEX_HTML_GZIP
+    return INDEX_HTML_BYTES
 
 @app.route('/api/folders')
 def api_folders():
     """Get folder tree"""
+    global folder_tree_cache
     response.content_type = 'application/json'
 
-    if not os.path.exists(BASE_PATH):
-        return json.dumps({'error': 'BASE_PATH does not exist', 'folders': []})
-
-    folders = get_folder_tree(BASE_PATH)
-    return json.dumps({'folders': folders})
+    try:
+        mtime = os.stat(BASE_PATH).st_mtime_ns
+    except OSError:
+        return to_json_bytes({'error': 'BASE_PATH does not exist', 'folders': []})
+
+    watching = file_watcher is not None and file_watcher.is_alive()
+    cached = folder_tree_cache if watching else None
+    if cached is None or cached[0] != mtime:
+        body = to_json_bytes({'folders': get_folder_tree(BASE_PATH)})
+        cached = (mtime, body, '"' + hashlib.sha1(body).hexdigest() + '"')
+        if watching:
+            folder_tree_cache = cached
+
+    _, body, etag = cached
+    response.set_header('ETag', etag)
+    response.set_header('Cache-Control', 'no-cache')
+    if request.get_header('If-None-Match') == etag:
+        response.status = 304
+        return b''
+    return body
 
 @app.route('/api/images')
 def api_images():
@@ -1746,14 +2586,39 @@ def api_images():
     sort_option = request.query.get('sort', '')
 
     if not folder_rel:
-        return json.dumps({'error': 'No folder specified', 'images': []})
-
-    folder_path = os.path.join(BASE_PATH, folder_rel)
-    if not os.path.exists(folder_path) or not os.path.isdir(folder_path):
-        return json.dumps({'error': 'Invalid folder', 'images': []})
-
-    # Get all images
-    images = get_images_in_folder(folder_path, recursive)
+        return to_json_bytes({'error': 'No folder specified', 'images': []})
+
+    # Normalized once here so every path scandir builds below it is already a normalized cache key
+    folder_path = os.path.normpath(os.path.join(BASE_PATH, folder_rel))
+    # isdir is a single stat and is already False for missing paths
+    if not os.path.isdir(folder_path):
+        return to_json_bytes({'error': 'Invalid folder', 'images': []})
+
+    # While the watcher runs, every change to files, folders or cached tags bumps a
+    # version, so an unchanged listing is answered with 304 before any scan. Read
+    # before scanning: a change during the scan only makes the next ETag differ
+    if file_watcher is not None and file_watcher.is_alive():
+        query_hash = hashlib.sha1(request.query_string.encode('utf-8')).hexdigest()[:16]
+        etag = f'"{cache_manager.version:x}-{listing_version:x}-{query_hash}"'
+        response.set_header('ETag', etag)
+        response.set_header('Cache-Control', 'no-cache')
+        if request.get_header('If-None-Match') == etag:
+            response.status = 304
+            return b''
+
+    # mtimes come from the same scandir pass, so neither the cache check nor the
+    # modified sort below stat the files again
+    mtimes = {img: stat.st_mtime for img, stat in get_images_in_folder(folder_path, recursive, with_stat=True)}
+    images = list(mtimes)
+
+    # Read tags for uncached images in parallel up front; filtering and
+    # response building below are then chained lazily over the looked up tags
+    image_tags = cache_manager.get_many(mtimes)
+    image_tags.update(read_tags_parallel([img for img, tags in image_tags.items() if tags is None], mtimes))
+
+    # A recursive listing already covers the subfolders
+    if not recursive:
+        prefetch_subfolder_tags(folder_path)
 
     # Filter by search query if provided
     if search_query:
@@ -1761,44 +2626,130 @@ def api_images():
 
     # Sort images if sort option provided
     if sort_option:
-        images = sort_images(images, sort_option)
-
-    # Build response with image info
-    result = []
-    for img_path in images:
-        tags = get_tags_for_image(img_path)
-        result.append({
-            'path': img_path,
-            'name': os.path.basename(img_path),
-            'tags': tags
-        })
-
-    # Save cache after processing
-    cache_manager.save_cache()
-
-    return json.dumps({'images': result})
+        images = sort_images(images, sort_option, mtimes, image_tags)
+
+    # Stream the response in chunks instead of building the full result list
+    def generate():
+        try:
+            yield b'{"images":['
+            parts = []
+            separator = b''
+            # Locals for the per-image loop
+            record = get_image_record
+            chunk_size = STREAM_CHUNK_SIZE
+            for img_path in images:
+                parts.append(record(img_path, image_tags[img_path], mtimes[img_path]))
+                if len(parts) >= chunk_size:
+                    yield separator + b','.join(parts)
+                    separator = b','
+                    parts = []
+            if parts:
+                yield separator + b','.join(parts)
+            yield b']}'
+        finally:
+            # Save cache after processing, off the request thread
+            cache_manager.save_cache_later()
+
+    return generate()
+
+def image_cache_control():
+    """Cache-Control value for the current /image or /thumb request"""
+    # Versioned URLs name one revision of the file, so the browser may keep them
+    if request.query.get('v'):
+        return f'public, max-age={VERSIONED_IMAGE_MAX_AGE}, immutable'
+    return f'public, max-age={IMAGE_MAX_AGE}'
 
 @app.route('/image')
 def serve_image():
     """Serve an image file"""
     image_path = request.query.get('path', '')
 
-    if not image_path or not os.path.exists(image_path):
+    if not image_path:
         response.status = 404
         return 'Image not found'
 
-    # Security check: ensure the path is within BASE_PATH
+    # Security check: ensure the path is within BASE_PATH. Existence is not checked
+    # here: the stat below (or the fronting server) answers 404 for missing files
     real_path = os.path.realpath(image_path)
-    real_base = os.path.realpath(BASE_PATH)
 
-    if not real_path.startswith(real_base):
+    if not is_within_base(real_path):
         response.status = 403
         return 'Access denied'
 
+    cache_control = image_cache_control()
+
+    # Optionally hand the file body to a fronting web server, which can send it
+    # with sendfile(2) instead of streaming it through Python
+    sendfile_header = WEB_CONFIG.get('sendfile_header')
+    if sendfile_header:
+        response.content_type = mimetypes.guess_type(real_path)[0] or 'application/octet-stream'
+    if sendfile_header == 'X-Accel-Redirect':
+        # nginx: internal location mapped onto BASE_PATH
+        rel_path = os.path.relpath(real_path, REAL_BASE).replace(os.sep, '/')
+        prefix = WEB_CONFIG.get('sendfile_prefix', '/protected-images/')
+        response.set_header('X-Accel-Redirect', prefix.rstrip('/') + '/' + quote(rel_path))
+        response.set_header('Cache-Control', cache_control)
+        return ''
+    elif sendfile_header == 'X-Sendfile':
+        # Apache mod_xsendfile / lighttpd: absolute file path
+        response.set_header('X-Sendfile', real_path)
+        response.set_header('Cache-Control', cache_control)
+        return ''
+
+    # Strong validator from mtime and size, so revalidations get a 304 without a body
+    try:
+        stat = os.stat(real_path)
+    except OSError:
+        response.status = 404
+        return 'Image not found'
+    etag = '"%x-%x"' % (stat.st_mtime_ns, stat.st_size)
+    if request.get_header('If-None-Match') == etag:
+        response.status = 304
+        response.set_header('ETag', etag)
+        response.set_header('Cache-Control', cache_control)
+        return ''
+
     directory = os.path.dirname(image_path)
     filename = os.path.basename(image_path)
 
-    return static_file(filename, root=directory)
+    # static_file returns an open file, which Bottle passes to the server's
+    # wsgi.file_wrapper (sendfile-backed on servers that support it)
+    result = static_file(filename, root=directory)
+    if not isinstance(result, HTTPError):
+        result.set_header('ETag', etag)
+        result.set_header('Cache-Control', cache_control)
+    return result
+
+@app.route('/thumb')
+def serve_thumbnail():
+    """Serve a downscaled copy of an image for the gallery grid"""
+    image_path = request.query.get('path', '')
+
+    if not image_path:
+        response.status = 404
+        return 'Image not found'
+
+    # Security check: ensure the path is within BASE_PATH
+    real_path = os.path.realpath(image_path)
+
+    if not is_within_base(real_path):
+        response.status = 403
+        return 'Access denied'
+
+    try:
+        size = min(max(int(request.query.get('w', THUMB_SIZE)), 32), THUMB_MAX_SIZE)
+    except ValueError:
+        size = THUMB_SIZE
+
+    thumb_path = get_thumbnail(real_path, size, THUMB_DIR)
+    if thumb_path is None:
+        # Pillow not installed or the image can't be decoded: send the original
+        return serve_image()
+
+    result = static_file(os.path.basename(thumb_path), root=THUMB_DIR, mimetype='image/webp')
+    if not isinstance(result, HTTPError):
+        result.set_header('Cache-Control', image_cache_control())
+    return result
 
 @app.route('/api/tags', method='POST')
 def api_update_tags():
@@ -1810,43 +2761,89 @@ def api_update_tags():
         data = request.json
         if not data:
             response.status = 400
-            return json.dumps({'error': 'No data provided'})
+            return to_json_bytes({'error': 'No data provided'})
 
         image_path = data.get('path', '')
         new_tags = data.get('tags', '')
 
-        if not image_path:
-            response.status = 400
-            return json.dumps({'error': 'No image path specified'})
-
-        if not os.path.exists(image_path):
-            response.status = 404
-            return json.dumps({'error': 'Image not found'})
-
-        # Security check: ensure the path is within BASE_PATH
-        real_path = os.path.realpath(image_path)
-        real_base = os.path.realpath(BASE_PATH)
-
-        if not real_path.startswith(real_base):
-            response.status = 403
-            return json.dumps({'error': 'Access denied'})
-
-        # Write tags using metadata module
-        from core.metadata import write_tag_metadata
+        invalid = check_tag_target(image_path)
+        if invalid:
+            response.status, error = invalid
+            return to_json_bytes({'error': error})
 
         if write_tag_metadata(image_path, new_tags):
             # Update cache with new tags
             cache_manager.update_cache(image_path, new_tags)
-            cache_manager.save_cache()
+            cache_manager.save_cache_later()
 
-            return json.dumps({'success': True, 'message': 'Tags updated successfully'})
+            return to_json_bytes({'success': True, 'message': 'Tags updated successfully'})
         else:
             response.status = 500
-            return json.dumps({'error': 'Failed to write tags'})
+            return to_json_bytes({'error': 'Failed to write tags'})
 
     except Exception as e:
         response.status = 500
-        return json.dumps({'error': str(e)})
+        return to_json_bytes({'error': str(e)})
+
+def write_tags_for_update(update):
+    """Write one {'path', 'tags'} update; returns (update, error message or None)"""
+    try:
+        if write_tag_metadata(update['path'], update['tags']):
+            return update, None
+        return update, 'Failed to write tags'
+    except Exception as e:
+        return update, str(e)
+
+@app.route('/api/tags/batch', method='POST')
+def api_update_tags_batch():
+    """Update tags for several images in one request"""
+    response.content_type = 'application/json'
+
+    try:
+        data = request.json
+        updates = data.get('updates') if isinstance(data, dict) else None
+        if not isinstance(updates, list):
+            response.status = 400
+            return to_json_bytes({'error': 'No updates provided'})
+
+        # One result per update, in request order; index identifies entries without a usable path
+        results = [None] * len(updates)
+        to_write = []
+        for index, update in enumerate(updates):
+            if not isinstance(update, dict):
+                results[index] = {'index': index, 'path': '', 'success': False, 'error': 'Invalid update'}
+                continue
+            image_path = update.get('path', '')
+            tags = update.get('tags', '')
+            if not isinstance(image_path, str):
+                invalid = (400, 'Invalid image path')
+            elif not isinstance(tags, str):
+                invalid = (400, 'Tags must be a string')
+            else:
+                invalid = check_tag_target(image_path)
+            if invalid:
+                results[index] = {'index': index, 'path': image_path if isinstance(image_path, str) else '',
+                                  'success': False, 'error': invalid[1]}
+            else:
+                to_write.append({'index': index, 'path': image_path, 'tags': tags})
+
+        # exiftool writes run in parallel; the cache is updated here on the calling thread
+        for update, error in metadata_pool.map(write_tags_for_update, to_write):
+            index = update['index']
+            if error:
+                results[index] = {'index': index, 'path': update['path'], 'success': False, 'error': error}
+            else:
+                cache_manager.update_cache(update['path'], update['tags'])
+                results[index] = {'index': index, 'path': update['path'], 'success': True}
+
+        # One cache write for the whole batch, off the request thread
+        cache_manager.save_cache_later()
+
+        return to_json_bytes({'success': all(result['success'] for result in results), 'results': results})
+
+    except Exception as e:
+        response.status = 500
+        return to_json_bytes({'error': str(e)})
 
 @app.route('/api/refresh', method='POST')
 def api_refresh():
@@ -1858,53 +2855,83 @@ def api_refresh():
 
     if not folder_rel:
         response.status = 400
-        return json.dumps({'error': 'No folder specified'})
+        return to_json_bytes({'error': 'No folder specified'})
 
-    folder_path = os.path.join(BASE_PATH, folder_rel)
-    if not os.path.exists(folder_path) or not os.path.isdir(folder_path):
+    # Normalized once here so every path scandir builds below it is already a normalized cache key
+    folder_path = os.path.normpath(os.path.join(BASE_PATH, folder_rel))
+    if not os.path.isdir(folder_path):
         response.status = 400
-        return json.dumps({'error': 'Invalid folder'})
-
-    try:
-        # Get all images in folder
-        images = get_images_in_folder(folder_path, recursive)
-
-        refreshed_count = 0
-        skipped_count = 0
+        return to_json_bytes({'error': 'Invalid folder'})
 
-        for img_path in images:
-            norm_path = os.path.normpath(img_path)
-            current_mtime = os.path.getmtime(img_path)
+    # Folders may have been added or removed below the root without changing its mtime
+    invalidate_folder_tree()
+    # Drops records of files deleted or renamed since they were listed
+    with image_record_lock:
+        image_record_cache.clear()
 
-            # Check if file needs refresh
-            needs_refresh = False
-
-            if norm_path in cache_manager.cache_data:
-                cached_mtime = cache_manager.cache_data[norm_path]['mtime']
-                # Refresh if file is newer than cache (allowing 0.1s tolerance)
-                if current_mtime - cached_mtime > 0.1:
-                    needs_refresh = True
+    try:
+        # Scanning, freshness checks and re-reads are pipelined: stale files are handed
+        # to the metadata pool a batch at a time while the scan goes on, and only the
+        # stale files' mtimes are kept rather than the whole folder's
+        watching = file_watcher is not None and file_watcher.is_alive()
+        verified = cache_manager.verified_paths
+        image_count = 0
+        checking = {}       # scanned files awaiting the freshness check: {path: mtime}
+        stale_mtimes = {}   # files to re-read: {path: mtime}
+        queued = []         # stale files not yet handed to the pool
+        reads, waiting = [], {}
+
+        def check_and_queue(final=False):
+            nonlocal checking, queued
+            # One pass over the cache per chunk; files that are missing or whose
+            # mtime differs from the cached one come back as None
+            for img, tags in cache_manager.get_many(checking).items():
+                if tags is None:
+                    stale_mtimes[img] = checking[img]
+                    queued.append(img)
+            checking = {}
+            if len(queued) >= METADATA_BATCH_SIZE or (final and queued):
+                batch_reads, batch_waiting = start_tag_reads(queued)
+                reads.extend(batch_reads)
+                waiting.update(batch_waiting)
+                queued = []
+
+        try:
+            for entry in get_images_in_folder(folder_path, recursive, with_stat=not watching):
+                image_count += 1
+                if watching:
+                    # Entries already checked this session are kept fresh by the watcher,
+                    # so only the others are stat'ed for an mtime check
+                    img_path = entry
+                    if img_path in verified:
+                        continue
+                    try:
+                        mtime = os.stat(img_path).st_mtime
+                    except OSError:
+                        continue
                 else:
-                    skipped_count += 1
-            else:
-                # Not in cache, needs refresh
-                needs_refresh = True
-
-            if needs_refresh:
-                # Force re-read from file
-                tags = read_tag_metadata(img_path)
-                cache_manager.update_cache(img_path, tags)
-                refreshed_count += 1
-
-        # Save updated cache
-        cache_manager.save_cache()
+                    img_path, stat = entry
+                    mtime = stat.st_mtime
+                checking[img_path] = mtime
+                if len(checking) >= STREAM_CHUNK_SIZE:
+                    check_and_queue()
+            check_and_queue(final=True)
+        finally:
+            # Force re-read from file; always collected, so no claimed read is left hanging
+            collect_tag_reads(reads, waiting, stale_mtimes)
+
+        refreshed_count = len(stale_mtimes)
+        skipped_count = image_count - refreshed_count
+
+        # Save updated cache, off the request thread
+        cache_manager.save_cache_later()
 
         message = f'Refreshed {refreshed_count} modified file(s), skipped {skipped_count} up-to-date file(s)'
-        return json.dumps({'message': message, 'refreshed': refreshed_count, 'skipped': skipped_count})
+        return to_json_bytes({'message': message, 'refreshed': refreshed_count, 'skipped': skipped_count})
 
     except Exception as e:
         response.status = 500
-        return json.dumps({'error': str(e)})
+        return to_json_bytes({'error': str(e)})
 
 if __name__ == '__main__':
     # Verify BASE_PATH exists
@@ -1914,11 +2941,37 @@ if __name__ == '__main__':
         exit(1)
 
     print(f"Starting Gallery Tags web server...")
+    # Old thumbnails of edited or deleted images are never looked up again
+    threading.Thread(target=prune_thumbnails, args=(THUMB_DIR, THUMB_DIR_MAX_BYTES), daemon=True).start()
+    if WEB_CONFIG.get('use_polling', False):
+        # File system events are unreliable on network mounts; refresh checks mtimes instead
+        print("[Watcher] use_polling is set, cache freshness is checked on refresh")
+    else:
+        file_watcher = start_cache_watcher(cache_manager, BASE_PATH, SUPPORTED_EXTENSIONS_TUPLE,
+                                           on_dir_change=invalidate_folder_tree,
+                                           on_path_change=on_path_change)
     print(f"BASE_PATH: {BASE_PATH}")
     print(f"Access the gallery at: http://{WEB_CONFIG['host']}:{WEB_CONFIG['port']}")
 
+    # Prefer waitress (multi-threaded, pooled) over the stdlib wsgiref fallback,
+    # so image requests aren't blocked behind slow tag scans
+    if importlib.util.find_spec('waitress') is not None:
+        server_options = {'server': 'waitress', 'threads': WEB_CONFIG.get('threads', 16)}
+    else:
+        # Bottle's wsgiref server handles one request at a time; with ThreadingMixIn
+        # each request gets its own thread instead
+        from socketserver import ThreadingMixIn
+        from wsgiref.simple_server import WSGIServer
+
+        class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+            daemon_threads = True
+
+        print("waitress not installed, using the standard library's WSGI server with a thread per request")
+        server_options = {'server': 'wsgiref', 'server_class': ThreadingWSGIServer}
+
     app.run(
         host=WEB_CONFIG['host'],
         port=WEB_CONFIG['port'],
-        debug=WEB_CONFIG['debug']
+        debug=WEB_CONFIG['debug'],
+        **server_options
     )
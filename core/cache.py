@@ -2,14 +2,57 @@ import os
 import json
 import sys
 import time
+import sqlite3
+import threading
+from concurrent.futures import Future
+from functools import lru_cache
+from utils.helpers import parse_tags, tag_signature
+
+# Cache keys are normalized paths; the same files are looked up again and again
+# (every search in the desktop gallery, every export), so results are memoized
+_normpath = lru_cache(maxsize=65536)(os.path.normpath)
 
 class CacheManager:
     """Handles caching of image metadata to improve application startup performance"""
     
+    # Seconds without further changes before a deferred save writes the cache
+    SAVE_DELAY = 2.0
+    # Longest a deferred save waits while changes keep coming
+    SAVE_MAX_DELAY = 30.0
+    
     def __init__(self):
         self.cache_dir = self._get_cache_dir()
-        self.cache_file = os.path.join(self.cache_dir, "gallery_cache.json")
+        self.cache_file = os.path.join(self.cache_dir, "gallery_cache.db")
+        # Cache file of earlier versions, imported once when the database is new
+        self.legacy_cache_file = os.path.join(self.cache_dir, "gallery_cache.json")
         self.cache_data = {}
+        # Entries changed since the last save, written to disk incrementally:
+        # {path: cache item, or None if the entry was removed}
+        self._changes = {}
+        self._changes_lock = threading.Lock()
+        # Incremented on every change to cache_data, so callers can tell it changed
+        self.version = 0
+        # Parsed tag sets kept in memory only, keyed like cache_data: {path: (tags, frozenset, signature)}
+        self.tagset_cache = {}
+        # One (frozenset, signature) per distinct tag set, shared by every file that has it
+        self._shared_tag_info = {}
+        # True when cache_data has changes that are not yet written to disk
+        self.dirty = False
+        # Files whose cache entry was checked against or written from disk this session
+        self.verified_paths = set()
+        # Tag reads currently running, so concurrent callers share one read: {path: Future}
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        # Inverted index {tag: set of paths}, built on first tag search and kept in sync after
+        self.tag_index = None
+        self._index_lock = threading.Lock()
+        # Serializes writes of the cache file
+        self._write_lock = threading.Lock()
+        # Deferred saves: requested by save_cache_later, written by a background thread
+        self._save_requested = threading.Event()
+        self._last_change = 0.0
+        self._save_thread = None
+        self._save_thread_lock = threading.Lock()
         self._load_cache()
         print(f"[Cache] Initialized cache at {self.cache_file}")
     
@@ -27,71 +70,276 @@ class CacheManager:
         
         return cache_dir
     
+    def _connect(self):
+        """Open the cache database, creating its table if needed"""
+        conn = sqlite3.connect(self.cache_file)
+        # WAL makes a save append only the changed rows instead of rewriting the file
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('CREATE TABLE IF NOT EXISTS cache (path TEXT PRIMARY KEY, mtime REAL, tags TEXT)')
+        return conn
+    
     def _load_cache(self):
-        """Load cache data from file if it exists"""
-        if os.path.exists(self.cache_file):
+        """Load cache data from the database, importing a legacy JSON cache if it is new"""
+        try:
+            conn = self._connect()
             try:
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    self.cache_data = json.load(f)
+                self.cache_data = {path: {'mtime': mtime, 'tags': tags}
+                                   for path, mtime, tags in conn.execute('SELECT path, mtime, tags FROM cache')}
+                if not self.cache_data and os.path.exists(self.legacy_cache_file):
+                    with open(self.legacy_cache_file, 'r', encoding='utf-8') as f:
+                        self.cache_data = json.load(f)
+                    with conn:
+                        conn.executemany('INSERT OR REPLACE INTO cache (path, mtime, tags) VALUES (?, ?, ?)',
+                                         [(path, item['mtime'], item['tags']) for path, item in self.cache_data.items()])
+                    print(f"[Cache] Imported {len(self.cache_data)} items from {self.legacy_cache_file}")
+            finally:
+                conn.close()
+            if self.cache_data:
                 print(f"[Cache] Loaded {len(self.cache_data)} items from cache")
-            except Exception as e:
-                print(f"[Cache] Error loading cache: {e}")
-                self.cache_data = {}
-        else:
-            print("[Cache] No existing cache file found")
+            else:
+                print("[Cache] No existing cache found")
+        except Exception as e:
+            print(f"[Cache] Error loading cache: {e}")
+            self.cache_data = {}
+    
+    def _record_change(self, norm_path, item):
+        """Queue an entry (or None for a removal) for the next save"""
+        with self._changes_lock:
+            self._changes[norm_path] = item
+            self.version += 1
+        self.dirty = True
     
     def save_cache(self):
-        """Save cache data to file"""
-        try:
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self.cache_data, f, ensure_ascii=False, indent=2)
-            print(f"[Cache] Saved {len(self.cache_data)} items to cache")
-        except Exception as e:
-            print(f"[Cache] Error saving cache: {e}")
+        """Write changed entries to the cache database, skipping the write if nothing changed"""
+        with self._write_lock:
+            if not self.dirty:
+                return
+            # Take the pending changes first so updates made by other threads while
+            # writing are queued for the next save instead of lost
+            self.dirty = False
+            with self._changes_lock:
+                changes, self._changes = self._changes, {}
+            if not changes:
+                return
+            try:
+                conn = self._connect()
+                try:
+                    with conn:
+                        conn.executemany('INSERT OR REPLACE INTO cache (path, mtime, tags) VALUES (?, ?, ?)',
+                                         [(path, item['mtime'], item['tags'])
+                                          for path, item in changes.items() if item is not None])
+                        conn.executemany('DELETE FROM cache WHERE path = ?',
+                                         [(path,) for path, item in changes.items() if item is None])
+                finally:
+                    conn.close()
+                print(f"[Cache] Saved {len(changes)} changed items to cache")
+            except Exception as e:
+                # Requeued behind anything changed meanwhile, which is newer
+                with self._changes_lock:
+                    for path, item in changes.items():
+                        self._changes.setdefault(path, item)
+                self.dirty = True
+                print(f"[Cache] Error saving cache: {e}")
+    
+    def save_cache_later(self):
+        """Save the cache from a background thread once changes settle down.
+        A burst of changes is written once; call save_cache to write right away."""
+        self._last_change = time.monotonic()
+        with self._save_thread_lock:
+            if self._save_thread is None:
+                self._save_thread = threading.Thread(target=self._save_loop, name='cache-save', daemon=True)
+                self._save_thread.start()
+        self._save_requested.set()
+    
+    def _save_loop(self):
+        """Background thread behind save_cache_later"""
+        while True:
+            self._save_requested.wait()
+            deadline = time.monotonic() + self.SAVE_MAX_DELAY
+            while True:
+                remaining = min(self._last_change + self.SAVE_DELAY, deadline) - time.monotonic()
+                if remaining <= 0:
+                    break
+                time.sleep(remaining)
+            # Cleared before saving: changes made from here on request another save
+            self._save_requested.clear()
+            self.save_cache()
     
-    def get_cached_metadata(self, file_path):
-        """Get cached metadata for a file if available and up to date"""
-        norm_path = os.path.normpath(file_path)
+    def get_cached_metadata(self, file_path, file_mtime=None):
+        """Get cached metadata for a file if available and up to date.
+        Pass file_mtime when it is already known (e.g. from a scandir entry) to skip the stat."""
+        norm_path = _normpath(file_path)
         
         if norm_path in self.cache_data:
             cached_item = self.cache_data[norm_path]
-            file_mtime = os.path.getmtime(file_path)
+            if file_mtime is None:
+                file_mtime = os.path.getmtime(file_path)
             
             # Check if file has been modified since last cache
             if abs(cached_item['mtime'] - file_mtime) < 0.1:  # Allow small time difference (0.1s)
+                self.verified_paths.add(norm_path)
                 return cached_item['tags']
             else:
                 print(f"[Cache] File modified since cache: {os.path.basename(file_path)}")
         
         return None
     
-    def update_cache(self, file_path, tags):
-        """Update cache with new metadata for a file"""
-        norm_path = os.path.normpath(file_path)
+    def get_many(self, file_mtimes):
+        """Get cached metadata for many files in one pass.
+        Takes {path: current mtime} with paths already normalized (e.g. built by scandir
+        under a normalized folder) and returns {path: tags, or None if missing or stale}."""
+        cache_data = self.cache_data
+        verified = self.verified_paths
+        results = {}
+        for path, file_mtime in file_mtimes.items():
+            cached_item = cache_data.get(path)
+            if cached_item is None:
+                results[path] = None
+            elif abs(cached_item['mtime'] - file_mtime) < 0.1:
+                verified.add(path)
+                results[path] = cached_item['tags']
+            else:
+                print(f"[Cache] File modified since cache: {os.path.basename(path)}")
+                results[path] = None
+        return results
+    
+    def update_cache(self, file_path, tags, file_mtime=None):
+        """Update cache with new metadata for a file.
+        file_mtime may be passed when it was taken before the tags were read (e.g. from
+        a scandir entry); a change in between then simply shows up as stale later."""
+        norm_path = _normpath(file_path)
+        if file_mtime is None:
+            file_mtime = os.path.getmtime(file_path)
         
-        self.cache_data[norm_path] = {
-            'mtime': os.path.getmtime(file_path),
+        old_item = self.cache_data.get(norm_path)
+        item = self.cache_data[norm_path] = {
+            'mtime': file_mtime,
             'tags': tags
         }
+        self.verified_paths.add(norm_path)
+        self._record_change(norm_path, item)
+        if self.tag_index is not None and (old_item is None or old_item['tags'] != tags):
+            with self._index_lock:
+                if old_item is not None:
+                    self._unindex(norm_path, old_item['tags'])
+                self._index(norm_path, tags)
         
+    def begin_reads(self, file_paths):
+        """Claim tag reads for files.
+        Returns (paths the caller must read, {path: Future} for reads already running elsewhere)"""
+        owned = []
+        waiting = {}
+        with self._inflight_lock:
+            for file_path in file_paths:
+                norm_path = _normpath(file_path)
+                future = self._inflight.get(norm_path)
+                if future is None:
+                    self._inflight[norm_path] = Future()
+                    owned.append(file_path)
+                else:
+                    waiting[file_path] = future
+        return owned, waiting
+
+    def finish_read(self, file_path, tags, file_mtime=None):
+        """Store the result of a claimed read and release anyone waiting on it"""
+        self.update_cache(file_path, tags, file_mtime)
+        with self._inflight_lock:
+            future = self._inflight.pop(_normpath(file_path), None)
+        if future is not None:
+            future.set_result(tags)
+
+    def abort_reads(self, file_paths):
+        """Release claimed reads that did not complete"""
+        for file_path in file_paths:
+            with self._inflight_lock:
+                future = self._inflight.pop(_normpath(file_path), None)
+            if future is not None:
+                future.set_exception(RuntimeError(f"Tag read failed: {file_path}"))
+
+    def invalidate(self, file_path):
+        """Drop a file from the cache so its tags are re-read on next access"""
+        norm_path = _normpath(file_path)
+        self.verified_paths.discard(norm_path)
+        old_item = self.cache_data.pop(norm_path, None)
+        if old_item is not None:
+            self._record_change(norm_path, None)
+            if self.tag_index is not None:
+                with self._index_lock:
+                    self._unindex(norm_path, old_item['tags'])
+        self.tagset_cache.pop(norm_path, None)
+
+    def _index(self, norm_path, tags):
+        """Add a file to the tag index (caller holds _index_lock)"""
+        for tag in self.get_cached_tagset(norm_path, tags):
+            self.tag_index.setdefault(tag, set()).add(norm_path)
+
+    def _unindex(self, norm_path, tags):
+        """Remove a file from the tag index (caller holds _index_lock)"""
+        for tag in self.get_cached_tagset(norm_path, tags):
+            paths = self.tag_index.get(tag)
+            if paths is not None:
+                paths.discard(norm_path)
+                if not paths:
+                    del self.tag_index[tag]
+
+    def find_files_with_tags(self, required_tags, match_all=True):
+        """Get the set of cached files having all (or with match_all=False, any) of the tags"""
+        with self._index_lock:
+            if self.tag_index is None:
+                self.tag_index = {}
+                for norm_path, item in list(self.cache_data.items()):
+                    self._index(norm_path, item['tags'])
+            postings = sorted((self.tag_index.get(tag, set()) for tag in required_tags), key=len)
+            if not postings:
+                return set()
+            if match_all:
+                # Start from the smallest posting list; the result can only shrink from there
+                return postings[0].intersection(*postings[1:])
+            return set().union(*postings)
+
+    def get_cached_tag_info(self, file_path, tags):
+        """Get (tag set, tag signature) for a file, re-parsing only when its tag string changes"""
+        norm_path = _normpath(file_path)
+        entry = self.tagset_cache.get(norm_path)
+        if entry is None or entry[0] != tags:
+            tagset = frozenset(parse_tags(tags))
+            shared = self._shared_tag_info.get(tagset)
+            if shared is None:
+                shared = self._shared_tag_info[tagset] = (tagset, tag_signature(tagset))
+            entry = (tags,) + shared
+            self.tagset_cache[norm_path] = entry
+        return entry[1], entry[2]
+
+    def get_cached_tagset(self, file_path, tags):
+        """Get the parsed tag set for a file"""
+        return self.get_cached_tag_info(file_path, tags)[0]
+
     def get_cached_files_in_dir(self, dir_path):
         """Get a list of all cached files in the given directory"""
-        dir_path = os.path.normpath(dir_path)
+        dir_path = _normpath(dir_path)
         return [path for path in self.cache_data.keys() 
                 if os.path.dirname(path) == dir_path]
     
     def clean_missing_files(self):
         """Remove entries from cache that no longer exist in the filesystem"""
-        before_count = len(self.cache_data)
+        missing = {path for path in self.cache_data if not os.path.exists(path)}
         self.cache_data = {path: data for path, data in self.cache_data.items() 
-                          if os.path.exists(path)}
-        removed = before_count - len(self.cache_data)
-        if removed > 0:
-            print(f"[Cache] Removed {removed} missing files from cache")
+                          if path not in missing}
+        self.tagset_cache = {path: entry for path, entry in self.tagset_cache.items()
+                             if path in self.cache_data}
+        self._shared_tag_info = {entry[1]: entry[1:] for entry in self.tagset_cache.values()}
+        self.verified_paths &= self.cache_data.keys()
+        with self._index_lock:
+            self.tag_index = None
+        for path in missing:
+            self._record_change(path, None)
+        if missing:
+            print(f"[Cache] Removed {len(missing)} missing files from cache")
     
     def get_mtime(self, file_path):
         """Get cached modification time for a file if available"""
-        norm_path = os.path.normpath(file_path)
+        norm_path = _normpath(file_path)
         
         if norm_path in self.cache_data:
             return self.cache_data[norm_path]['mtime']
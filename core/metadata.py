@@ -1,8 +1,11 @@
 import os
 import re
+import json
+import atexit
 import shutil
 import sys
 import subprocess
+import threading
 import ctypes
 from ctypes import wintypes, windll
 from config import FORMAT_CONFIG
@@ -10,6 +13,8 @@ from config import FORMAT_CONFIG
 # Helper to get all supported extensions
 SUPPORTED_EXTENSIONS = [ext for format_info in FORMAT_CONFIG.values() 
                        for ext in format_info['extensions']]
+# Lowercased tuple so a single str.endswith call can test every extension
+SUPPORTED_EXTENSIONS_TUPLE = tuple(ext.lower() for ext in SUPPORTED_EXTENSIONS)
 
 def check_exiftool():
     """Check if exiftool is available in the system"""
@@ -77,6 +82,116 @@ def read_tag_metadata(image_path, short_path=None):
         print(f"Error reading metadata from {image_path}: {e}")
         return ""
 
+class ExifToolProcess:
+    """A long-running exiftool (-stay_open) that executes one argument list at a time,
+    so repeated reads don't pay exiftool's startup time"""
+
+    def __init__(self):
+        self.proc = subprocess.Popen(
+            ['exiftool', '-stay_open', 'True', '-@', '-'],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+
+    def execute(self, args):
+        """Run exiftool with the given arguments (one per line) and return its output"""
+        self.proc.stdin.write(('\n'.join(args) + '\n-execute\n').encode('utf-8'))
+        self.proc.stdin.flush()
+        # Output of each command ends with a {ready} line
+        lines = []
+        while True:
+            line = self.proc.stdout.readline()
+            if not line:
+                raise RuntimeError(f"exiftool exited with code {self.proc.poll()}")
+            if line.rstrip() == b'{ready}':
+                return b''.join(lines).decode('utf-8')
+            lines.append(line)
+
+    def close(self):
+        try:
+            self.proc.stdin.write(b'-stay_open\nFalse\n')
+            self.proc.stdin.close()
+            self.proc.wait(timeout=5)
+        except Exception:
+            self.proc.kill()
+
+# Idle exiftool processes; more are started while all are busy, and those beyond
+# EXIFTOOL_MAX_IDLE are stopped when they are handed back
+EXIFTOOL_MAX_IDLE = os.cpu_count() or 1
+_idle_exiftools = []
+_exiftool_lock = threading.Lock()
+
+def run_exiftool(args):
+    """Run exiftool with args on a pooled -stay_open process and return its output"""
+    with _exiftool_lock:
+        process = _idle_exiftools.pop() if _idle_exiftools else None
+    if process is None:
+        process = ExifToolProcess()
+    try:
+        output = process.execute(args)
+    except Exception:
+        # The process may be stuck mid-command or gone; never reuse it
+        process.close()
+        raise
+    with _exiftool_lock:
+        if len(_idle_exiftools) < EXIFTOOL_MAX_IDLE:
+            _idle_exiftools.append(process)
+            process = None
+    if process is not None:
+        process.close()
+    return output
+
+def stop_exiftools():
+    """Stop all idle pooled exiftool processes"""
+    with _exiftool_lock:
+        processes = _idle_exiftools[:]
+        _idle_exiftools.clear()
+    for process in processes:
+        process.close()
+
+atexit.register(stop_exiftools)
+
+def _json_tag_text(value):
+    """Turn a value from exiftool -json output into tag text; lists are joined with ', '"""
+    if isinstance(value, list):
+        return ', '.join(_json_tag_text(item) for item in value)
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value).strip()
+
+def read_tag_metadata_batch(image_paths):
+    """Read tag metadata for many files with one exiftool run per metadata field.
+    Returns a dict of {image_path: tags}; falls back to per-file reads on failure."""
+    results = {}
+    by_field = {}
+    for image_path in image_paths:
+        field = get_metadata_field(image_path)
+        if not field:
+            print(f"Unsupported file format: {image_path}")
+            results[image_path] = ""
+        else:
+            by_field.setdefault(field, []).append(image_path)
+
+    for field, paths in by_field.items():
+        # -json keys are the bare tag name, e.g. '-Exif:ImageDescription' -> 'ImageDescription'
+        key = field.lstrip('-').split(':')[-1]
+        try:
+            # Arguments, file names included, go through the process's argfile on stdin,
+            # so there are no command line limits
+            output = run_exiftool(['-charset', 'filename=utf8', '-json', field] + paths)
+            if not output.strip():
+                raise RuntimeError("exiftool returned no output")
+            # Numbers are kept as the text exiftool printed (1.50, not 1.5)
+            items = json.loads(output, parse_int=str, parse_float=str)
+            found = {os.path.normpath(item['SourceFile']): _json_tag_text(item.get(key, ''))
+                     for item in items}
+            for image_path in paths:
+                results[image_path] = found.get(os.path.normpath(image_path), "")
+        except Exception as e:
+            print(f"ExifTool batch read failed, reading files one by one: {e}")
+            for image_path in paths:
+                results[image_path] = read_tag_metadata(image_path)
+    return results
+
 def write_tag_metadata(image_path, tag_text, short_path=None):
     """Write tag metadata using exiftool"""
     try:
@@ -106,7 +221,7 @@ def write_tag_metadata(image_path, tag_text, short_path=None):
 def process_exports_headless(working_dir, config_path):
     """Process exports in headless mode"""
     from core.cache import CacheManager
-    from utils.helpers import parse_tags
+    from utils.helpers import parse_query_tags
     from config import EXPORT_CONFIG
     import json, os
     
@@ -126,7 +241,7 @@ def process_exports_headless(working_dir, config_path):
         image_files = []
         for root, _, files in os.walk(working_dir):
             for filename in files:
-                if any(filename.lower().endswith(ext) for ext in SUPPORTED_EXTENSIONS):
+                if filename.lower().endswith(SUPPORTED_EXTENSIONS_TUPLE):
                     image_files.append(os.path.join(root, filename))
         
         if not image_files:
@@ -149,13 +264,15 @@ def process_exports_headless(working_dir, config_path):
                 
                 # Parse tag query
                 tags_str = tags_str.strip()
-                is_or_mode = tags_str.startswith('|')
-                if tags_str.startswith('|') or tags_str.startswith('&'):
+                mode_prefix = tags_str[:1]
+                is_or_mode = mode_prefix == '|'
+                if mode_prefix in ('|', '&'):
                     tags_str = tags_str[1:].strip()
-                required_tags = parse_tags(tags_str)
+                required_tags = parse_query_tags(tags_str)
                 
-                # Match images
+                # Match images, testing each distinct tag set once
                 matched_images = []
+                matched_by_tagset = {}
                 for img_path in image_files:
                     # Get tags from cache or read fresh
                     tags = cache_manager.get_cached_metadata(img_path)
@@ -163,14 +280,18 @@ def process_exports_headless(working_dir, config_path):
                         tags = get_metadata_field(img_path)
                         cache_manager.update_cache(img_path, tags)
                     
-                    img_tags = parse_tags(tags)
+                    # Parsed once per image and reused across export entries
+                    img_tags = cache_manager.get_cached_tagset(img_path, tags)
                     
-                    if is_or_mode:
-                        if any(tag in img_tags for tag in required_tags):
-                            matched_images.append(img_path)
-                    else:
-                        if all(tag in img_tags for tag in required_tags):
-                            matched_images.append(img_path)
+                    matched = matched_by_tagset.get(img_tags)
+                    if matched is None:
+                        if is_or_mode:
+                            matched = not required_tags.isdisjoint(img_tags)
+                        else:
+                            matched = required_tags.issubset(img_tags)
+                        matched_by_tagset[img_tags] = matched
+                    if matched:
+                        matched_images.append(img_path)
                 
                 print(f"Found {len(matched_images)} matching images")
                 
@@ -0,0 +1,95 @@
+import os
+import hashlib
+import threading
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional
+    Image = None
+
+def get_thumbnail(image_path, size, thumb_dir):
+    """Get the path of a cached WebP thumbnail whose shorter side is at most size.
+    The thumbnail is created on first use and keyed on the file's path and mtime.
+    Returns None if Pillow is not installed or the image can't be read."""
+    if Image is None:
+        return None
+
+    try:
+        mtime = os.path.getmtime(image_path)
+        key = f"{image_path}|{mtime}|{size}".encode('utf-8')
+        thumb_path = os.path.join(thumb_dir, hashlib.sha1(key).hexdigest() + '.webp')
+        if os.path.exists(thumb_path):
+            return thumb_path
+
+        os.makedirs(thumb_dir, exist_ok=True)
+        with Image.open(image_path) as img:
+            # Cards crop with object-fit: cover, so the shorter side is fitted to size
+            target = _cover_size(img.size, size)
+            if target != img.size:
+                # JPEG only: decode directly at a reduced scale
+                img.draft('RGB', target)
+            # Photos may be rotated via EXIF, which the browser applies to originals
+            thumb = ImageOps.exif_transpose(img)
+            thumb = thumb.convert('RGBA' if 'A' in thumb.getbands() or 'transparency' in thumb.info else 'RGB')
+            target = _cover_size(thumb.size, size)
+            if target != thumb.size:
+                thumb = thumb.resize(target, Image.LANCZOS)
+
+            # Written under a temporary name, so concurrent requests never serve a partial file
+            temp_path = f"{thumb_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                thumb.save(temp_path, 'WEBP', quality=80)
+                os.replace(temp_path, thumb_path)
+            except Exception:
+                # Don't leave a partial file behind (e.g. disk full)
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+                raise
+        return thumb_path
+    except Exception as e:
+        print(f"Error creating thumbnail for {image_path}: {e}")
+        return None
+
+def prune_thumbnails(thumb_dir, max_bytes):
+    """Delete the oldest thumbnails until thumb_dir holds at most max_bytes.
+    Thumbnails are keyed on mtime and size, so edited images leave old ones behind;
+    leftover temporary files from an interrupted run are always removed."""
+    try:
+        with os.scandir(thumb_dir) as it:
+            entries = [(stat.st_mtime, stat.st_size, entry.path)
+                       for entry in it if entry.is_file() for stat in (entry.stat(),)]
+    except OSError:
+        return  # Not created yet
+
+    thumbnails = []
+    total = 0
+    for mtime, size, path in entries:
+        if path.endswith('.tmp'):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        else:
+            thumbnails.append((mtime, size, path))
+            total += size
+
+    # Oldest first
+    thumbnails.sort()
+    for mtime, size, path in thumbnails:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+def _cover_size(image_size, size):
+    """Scale (width, height) down so its shorter side is size; never scales up"""
+    width, height = image_size
+    scale = size / min(width, height)
+    if scale >= 1:
+        return image_size
+    return max(1, round(width * scale)), max(1, round(height * scale))
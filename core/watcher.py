@@ -0,0 +1,79 @@
+import os
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:  # watchdog is optional
+    Observer = None
+    FileSystemEventHandler = object
+
+class CacheInvalidationHandler(FileSystemEventHandler):
+    """Drops cache entries for image files as soon as they change on disk"""
+    
+    def __init__(self, cache_manager, extensions, on_dir_change=None, on_path_change=None):
+        super().__init__()
+        self.cache_manager = cache_manager
+        self.extensions = extensions
+        self.on_dir_change = on_dir_change
+        self.on_path_change = on_path_change
+    
+    def _invalidate(self, path):
+        if path.lower().endswith(self.extensions):
+            self.cache_manager.invalidate(path)
+    
+    def _dir_changed(self):
+        if self.on_dir_change is not None:
+            self.on_dir_change()
+    
+    def _path_changed(self):
+        if self.on_path_change is not None:
+            self.on_path_change()
+    
+    def on_created(self, event):
+        self._path_changed()
+        if event.is_directory:
+            self._dir_changed()
+        else:
+            self._invalidate(event.src_path)
+    
+    def on_modified(self, event):
+        if not event.is_directory:
+            self._invalidate(event.src_path)
+    
+    def on_closed(self, event):
+        # A file finished writing (inotify IN_CLOSE_WRITE); tags read while it was
+        # still being written are dropped too
+        if not event.is_directory:
+            self._invalidate(event.src_path)
+    
+    def on_deleted(self, event):
+        self._path_changed()
+        if event.is_directory:
+            self._dir_changed()
+        else:
+            self._invalidate(event.src_path)
+    
+    def on_moved(self, event):
+        self._path_changed()
+        if event.is_directory:
+            self._dir_changed()
+        else:
+            self._invalidate(event.src_path)
+            self._invalidate(event.dest_path)
+
+def start_cache_watcher(cache_manager, path, extensions, on_dir_change=None, on_path_change=None):
+    """Watch path recursively and invalidate cache entries on change.
+    on_dir_change is called whenever a folder is created, deleted or moved;
+    on_path_change whenever any file, folder or link is.
+    Returns the running observer, or None if watchdog is not installed."""
+    if Observer is None:
+        print("[Watcher] watchdog not installed, cache freshness is checked on refresh")
+        return None
+    
+    observer = Observer()
+    observer.schedule(CacheInvalidationHandler(cache_manager, extensions, on_dir_change, on_path_change),
+                      os.path.normpath(path), recursive=True)
+    observer.daemon = True
+    observer.start()
+    print(f"[Watcher] Watching {path} for changes")
+    return observer
@@ -13,7 +13,7 @@ from components.export_config_dialog import ExportConfigDialog
 from core.cache import CacheManager
 from core.metadata import get_metadata_field
 from config import APP_CONFIG, EXPORT_CONFIG, EXPORT_CONFIG_FILENAME
-from utils.helpers import natural_sort_key, parse_tags
+from utils.helpers import natural_sort_key, parse_query_tags, tag_signature
 
 class ImageGallery(QMainWindow):
     def __init__(self):
@@ -216,19 +216,28 @@ class ImageGallery(QMainWindow):
             return
         
         # Parse search terms and determine search mode
-        search_tags = parse_tags(search_text)
+        search_tags = parse_query_tags(search_text)
+        search_sig = tag_signature(search_tags)
         is_and_mode = self.search_mode.currentText() == "AND"
         
+        # Cells with identical tags share one tag set object, so each distinct set is tested once
+        visible_by_tagset = {}
+        
         # Filter and show matching cells
         for cell in self.image_cells:
-            cell_tags = parse_tags(cell.tag_text)
+            # Parsed tag sets are cached, so repeated searches don't re-split tag strings
+            cell_tags, cell_sig = self.cache_manager.get_cached_tag_info(cell.image_path, cell.tag_text)
             
-            if is_and_mode:
-                # AND mode: all search tags must be present
-                visible = all(search_tag in cell_tags for search_tag in search_tags)
-            else:
-                # OR mode: any search tag must be present
-                visible = any(search_tag in cell_tags for search_tag in search_tags)
+            visible = visible_by_tagset.get(cell_tags)
+            if visible is None:
+                # The signature check rejects most non-matching cells before any set lookup
+                if is_and_mode:
+                    # AND mode: all search tags must be present
+                    visible = (cell_sig & search_sig) == search_sig and search_tags.issubset(cell_tags)
+                else:
+                    # OR mode: any search tag must be present
+                    visible = bool(cell_sig & search_sig) and not search_tags.isdisjoint(cell_tags)
+                visible_by_tagset[cell_tags] = visible
             
             if visible:
                 cell.show()
@@ -247,7 +256,7 @@ class ImageGallery(QMainWindow):
             self.load_images(folder_path)
     
     def load_images(self, folder_path):
-        from core.metadata import SUPPORTED_EXTENSIONS
+        from core.metadata import SUPPORTED_EXTENSIONS, SUPPORTED_EXTENSIONS_TUPLE
         
         self.current_folder = os.path.normpath(folder_path)
         print(f"[Cache] Loading images from: {self.current_folder}")
@@ -257,12 +266,11 @@ class ImageGallery(QMainWindow):
         
         # Get all supported image files in the folder
         image_files = []
-        for filename in os.listdir(folder_path):
-            filepath = os.path.join(folder_path, filename)
-            if os.path.isfile(filepath):
-                ext = os.path.splitext(filename)[1].lower()
-                if ext in SUPPORTED_EXTENSIONS:
-                    image_files.append(filepath)
+        # scandir entries carry the file type, so is_file() needs no extra stat
+        with os.scandir(folder_path) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.lower().endswith(SUPPORTED_EXTENSIONS_TUPLE):
+                    image_files.append(entry.path)
         
         if not image_files:
             QMessageBox.information(self, "No Images", 
@@ -694,27 +702,33 @@ class ImageGallery(QMainWindow):
 
                 # Determine search mode and clean tags string
                 tags_str = tags_str.strip()
-                is_or_mode = tags_str.startswith('|')
+                mode_prefix = tags_str[:1]
+                is_or_mode = mode_prefix == '|'
                 # Remove prefix if exists
-                if tags_str.startswith('|') or tags_str.startswith('&'):
+                if mode_prefix in ('|', '&'):
                     tags_str = tags_str[1:].strip()
                 
                 # Parse the tags using helper function
-                required_tags = parse_tags(tags_str)
+                required_tags = parse_query_tags(tags_str)
+                required_sig = tag_signature(required_tags)
         
-                # Filter images based on tags
+                # Filter images based on tags, testing each distinct tag set once
                 matched_images = []
+                matched_by_tagset = {}
                 for cell in self.image_cells:
-                    cell_tags = parse_tags(cell.tag_text)
+                    cell_tags, cell_sig = self.cache_manager.get_cached_tag_info(cell.image_path, cell.tag_text)
                     
-                    if is_or_mode:
-                        # OR mode: any required tag must be present
-                        if any(tag in cell_tags for tag in required_tags):
-                            matched_images.append(cell.image_path)
-                    else:
-                        # AND mode (default): all required tags must be present
-                        if all(tag in cell_tags for tag in required_tags):
-                            matched_images.append(cell.image_path)
+                    matched = matched_by_tagset.get(cell_tags)
+                    if matched is None:
+                        if is_or_mode:
+                            # OR mode: any required tag must be present
+                            matched = bool(cell_sig & required_sig) and not required_tags.isdisjoint(cell_tags)
+                        else:
+                            # AND mode (default): all required tags must be present
+                            matched = (cell_sig & required_sig) == required_sig and required_tags.issubset(cell_tags)
+                        matched_by_tagset[cell_tags] = matched
+                    if matched:
+                        matched_images.append(cell.image_path)
 
                 # Generate export content
                 content = EXPORT_CONFIG['heading'] + '\n'
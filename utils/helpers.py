@@ -1,4 +1,5 @@
 import os, re, shutil, ctypes, sys
+from functools import lru_cache
 from ctypes import wintypes, windll
 
 def natural_sort_key(s):
@@ -39,6 +40,7 @@ def parse_tags(tag_string):
     """
     Parse a comma-separated tag string into a set of cleaned tags.
     Strips whitespace and converts to lowercase for consistency.
+    Tags are interned, so images sharing a tag share one string object.
     
     Args:
         tag_string: String containing comma-separated tags
@@ -48,4 +50,38 @@ def parse_tags(tag_string):
     """
     if not tag_string:
         return set()
-    return {tag.strip().lower() for tag in tag_string.split(',') if tag.strip()}
+    # Lowercase once for the whole string and strip each tag only once
+    return {sys.intern(tag) for tag in map(str.strip, tag_string.lower().split(',')) if tag}
+
+@lru_cache(maxsize=1024)
+def parse_query_tags(query):
+    """
+    Parse a search or export query like parse_tags, caching the result.
+    Repeated searches with the same query skip parsing entirely.
+    
+    Args:
+        query: String containing comma-separated tags
+        
+    Returns:
+        Frozenset of cleaned tag strings (shared between calls, so immutable)
+    """
+    return frozenset(parse_tags(query))
+
+def tag_signature(tags):
+    """
+    Build a 64-bit Bloom filter with two bits set per tag (by hash).
+    If a query's bits are not all present in an image's signature, the image
+    cannot contain every query tag, so most non-matches are rejected with a
+    single integer AND before any set lookups.
+    
+    Args:
+        tags: Iterable of cleaned tag strings
+        
+    Returns:
+        Integer bitmap of the tags
+    """
+    sig = 0
+    for tag in tags:
+        h = hash(tag)
+        sig |= (1 << (h & 63)) | (1 << ((h >> 6) & 63))
+    return sig